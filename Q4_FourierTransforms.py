@@ -1,80 +1,85 @@
 import numpy as np
-import matplotlib.pyplot as plt
-
-def signalFunc(t):
-    #The signal function as defined in the question
-    if (t>=5) and (t<=7):
-        return 4
-    else:
-        return 0
-    
-def responseFunc(t):
-    #The gaussian response function as defined in the question
-    return (1/np.sqrt(2*np.pi))*np.exp(-pow(t, 2)/4)
-
-#we wish to convolve signalFunc and responseFunc
-
-#First let's plot the functions
-#m was chosen to reduce aliasing.  See the write-up for a detailed explanation.
-m = 12 
-N = pow(2, m) #N is the number of samples
-
-tValues = np.linspace(-50, 50, N)
-
-#define the step size:
-spacing = tValues[1] - tValues[0]
-
-signal_y = np.zeros(len(tValues))
-for i in range(len(tValues)):
-    signal_y[i] = signalFunc(tValues[i])
-
-response_y = responseFunc(tValues)
-
-#Plot the functions
-plt.figure(1)
-plt.plot(tValues, signal_y, color = "blue", label = "y = h(t)")
-plt.plot(tValues, response_y, color = "red", label = "y = g(t)")
-plt.legend()
-plt.xlabel("t")
-plt.ylabel("y")
-plt.title("Signals to be convolved")
-plt.savefig("figures/originalFunctions.eps", format = "eps", dpi = 1000)
-
-#Now find the fourier transforms
-#we will sample both functions in the same places
-F_t = np.fft.fftfreq(len(tValues), spacing)
-#Account for 2pi scaling
-F_t = 2*np.pi*F_t
-#Get Fourier transforms of functions
-F_signal = np.fft.fft(signal_y)
-F_response = np.fft.fft(response_y)
-
-
-#Plot the Fourier transforms
-plt.figure(2)
-plt.plot(F_t, F_signal, color = "blue", label = "F[h(t)]")
-plt.plot(F_t, F_response, color = "red", label = "F[g(t)]")
-plt.legend()
-plt.title("Fourier transformed signals")
-plt.savefig("figures/transformedFunctions.eps", format = "eps", dpi = 1000)
-
-#Multiply the two fourier transforms together to get the transformed convolution
-F_convolution = F_signal*F_response
-
-#Perform inverse fourier transform
-convolution = np.fft.ifft(F_convolution)
-convolution = np.fft.ifftshift(convolution)
-#Account for scaling as detailed in the lecture notes.
-convolution = convolution*spacing
-
-#Plot the convolved function
-plt.figure(3)
-plt.plot(tValues, convolution)
-plt.title("Convolution")
-plt.xlabel("Time")
-plt.savefig("figures/convolvedFunctions.eps", format = "eps", dpi = 1000)
-
-
-
-plt.show()
+from compphys.fourierTransforms import signalFunc, responseFunc, angularFrequencies, convolve
+from compphys.plotting import FigureSpec, scriptRenderer
+from compphys.convergence import convergenceStudy
+import math
 
+
+def exactConvolution(t):
+    #The convolution of signalFunc and responseFunc found analytically.  The
+    #integral of the Gaussian over the pulse from t = 5 to 7 gives
+    #2 sqrt(2) (erf((t - 5)/2) - erf((t - 7)/2)).
+    erf = np.vectorize(math.erf)
+    return 2*np.sqrt(2)*(erf((t - 5)/2) - erf((t - 7)/2))
+
+
+def samplingError(N):
+    #The largest error in the convolution found with N samples
+    tValues, convolution = convolve(signalFunc, responseFunc, (-50, 50), N)
+    return np.max(np.abs(convolution - exactConvolution(tValues)))
+
+
+def main(renderer):
+    #renderer:  the FigureRenderer that saves the figures in the background
+
+    #we wish to convolve signalFunc and responseFunc
+
+    #First let's plot the functions
+    #m was chosen to reduce aliasing.  See the write-up for a detailed explanation.
+    m = 12 
+    N = pow(2, m) #N is the number of samples
+
+    tValues = np.linspace(-50, 50, N)
+
+    #define the step size:
+    spacing = tValues[1] - tValues[0]
+
+    signal_y = signalFunc(tValues)
+    response_y = responseFunc(tValues)
+
+    #Plot the functions
+    spec = FigureSpec("originalFunctions", title = "Signals to be convolved", xlabel = "t", ylabel = "y", legend = True)
+    spec.plot(tValues, signal_y, color = "blue", label = "y = h(t)")
+    spec.plot(tValues, response_y, color = "red", label = "y = g(t)")
+    renderer.submit(spec)
+
+    #Now find the fourier transforms
+    #we will sample both functions in the same places
+    #angularFrequencies() accounts for the 2pi scaling
+    F_t = angularFrequencies(len(tValues), spacing)
+    #Get Fourier transforms of functions
+    F_signal = np.fft.fft(signal_y)
+    F_response = np.fft.fft(response_y)
+
+
+    #Plot the Fourier transforms
+    spec = FigureSpec("transformedFunctions", title = "Fourier transformed signals", legend = True)
+    spec.plot(F_t, F_signal, color = "blue", label = "F[h(t)]")
+    spec.plot(F_t, F_response, color = "red", label = "F[g(t)]")
+    renderer.submit(spec)
+
+    #Multiplying the two fourier transforms together and transforming back gives
+    #the convolution.  This is done by convolve() above.
+    tValues, convolution = convolve(signalFunc, responseFunc, (-50, 50), N)
+
+    #Plot the convolved function
+    spec = FigureSpec("convolvedFunctions", title = "Convolution", xlabel = "Time")
+    spec.plot(tValues, convolution)
+    renderer.submit(spec)
+
+    #How the error depends on the number of samples.  The signal is a
+    #discontinuous pulse, so the error only falls as about 1/N, and
+    #irregularly, depending on where the edges of the pulse fall between
+    #the samples.
+    print("Convergence with the number of samples")
+    study = convergenceStudy(samplingError, [pow(2, m) for m in range(8, 15)], finerIsSmaller = False)
+    print(study.report())
+
+
+
+    renderer.show()
+
+
+if __name__ == "__main__":
+    with scriptRenderer() as renderer:
+        main(renderer)
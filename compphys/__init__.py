@@ -0,0 +1,24 @@
+#The numerical methods behind the Q#_ scripts, as an importable package.
+#
+#Importing any of these modules only defines functions.  Nothing is computed
+#or plotted, and only numpy is imported.  matplotlib is only imported by the
+#processes that draw figures, and numba only when an RHS is compiled.
+#
+#    floatingPoint:  neighbouring floating point numbers (Q1)
+#    matrixFunctions:  LU decomposition, matrix equations and products (Q2)
+#    interpolation:  Lagrange and cubic spline interpolation (Q3)
+#    fourierTransforms:  FFT convolution (Q4)
+#    differentialEquations:  Runge-Kutta, Adams-Bashforth and adaptive ODE solvers (Q5)
+#    profiling:  opt-in timing and rounding error instrumentation
+#    plotting:  saving figures in parallel worker processes
+#    convergence:  parallel convergence studies and fitted orders of accuracy
+#    benchmarks:  timings of every kernel over a range of sizes (python -m compphys.benchmarks)
+
+from .floatingPoint import findNearestNumbers
+from .matrixFunctions import (LU_decomposition, LU_decompositionPivoted, getDecomposition,
+    solveMatrixEquation, invert, factorize, matMul, solveTridiagonal)
+from .interpolation import (BarycentricInterpolator, CubicSpline, lagrangeInterpolation,
+    cubicSplineInterpolation, interpolateFile)
+from .fourierTransforms import convolve, convolveStream, OverlapAddConvolver
+from .differentialEquations import RHS, solveDifferentialEquation, solveEnsemble, solveLinearDifferentialEquation
+from .convergence import convergenceStudy
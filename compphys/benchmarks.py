@@ -0,0 +1,254 @@
+import numpy as np
+import argparse
+import json
+import platform
+import sys
+import time
+
+from . import matrixFunctions as m
+from .interpolation import lagrangeInterpolation, cubicSplineInterpolation
+from .fourierTransforms import signalFunc, responseFunc, convolve, clearSpectrumCache
+from .differentialEquations import RHS_func, solveDifferentialEquation
+
+#Benchmarks of the numerical kernels over a range of problem sizes.
+#
+#Run with
+#    python -m compphys.benchmarks --output results.json
+#to time every kernel and save the results, and add --baseline old.json to
+#compare them with an earlier run.  The comparison lists every size that has
+#become slower by more than the tolerance, and the exit status is 1 if there
+#are any, so it can be used to catch regressions automatically.
+#
+#As well as the time at each size, the scaling exponent k in time ~ size^k is
+#fitted to the larger sizes.  For large enough problems it tends to 3 for the
+#LU decomposition and matrix multiplication, 2 for solving a matrix equation
+#and 1 for everything else, but it is usually lower over these sizes, where
+#the per-call and per-block overheads still matter.
+
+
+def _matrix(n, rng):
+    #A random diagonally dominant matrix, so that LU_decomposition() (which
+    #doesn't pivot) is stable
+    return rng.random((n, n)) + n*np.eye(n)
+
+
+def _knots(rng):
+    #13 random knots, as many as in the Q3 data, on the same interval
+    x = np.sort(rng.uniform(-0.75, 1.5, 13))
+    return np.array([x, np.sin(4*x)])
+
+
+def setupLU(n, rng):
+    A = _matrix(n, rng)
+    return lambda: m.LU_decomposition(A)
+
+
+def setupSolve(n, rng):
+    L, U = m.getDecomposition(_matrix(n, rng))
+    b = rng.random(n)
+    return lambda: m.solveMatrixEquation(L, U, b)
+
+
+def setupMatMul(n, rng):
+    A = rng.random((n, n))
+    B = rng.random((n, n))
+    return lambda: m.matMul(A, B)
+
+
+def setupLagrange(n, rng):
+    data = _knots(rng)
+    xValues = np.linspace(data[0][0], data[0][-1], n)
+    return lambda: lagrangeInterpolation(data, xValues)
+
+
+def setupCubicSpline(n, rng):
+    data = _knots(rng)
+    xValues = np.linspace(data[0][0], data[0][-1], n)
+    return lambda: cubicSplineInterpolation(data, xValues)
+
+
+def setupConvolve(n, rng):
+    #The response's spectrum is cached between calls, so the cache is cleared
+    #each time to time the whole convolution
+    def run():
+        clearSpectrumCache()
+        return convolve(signalFunc, responseFunc, (-50, 50), n)
+    return run
+
+
+def setupDifferentialEquation(n, rng):
+    #n Runge-Kutta steps of the part c equation from Q5
+    tValues = np.linspace(0, 10, n + 1)
+    return lambda: solveDifferentialEquation(RHS_func, 1, tValues, 1)
+
+
+#name: (setup, smallest size, number of sizes).  setup(size, rng) returns the
+#function to time.  The sizes double each time.
+BENCHMARKS = {
+    "LU_decomposition": (setupLU, 32, 5),
+    "solveMatrixEquation": (setupSolve, 64, 5),
+    "matMul": (setupMatMul, 32, 5),
+    "lagrangeInterpolation": (setupLagrange, 1000, 6),
+    "cubicSplineInterpolation": (setupCubicSpline, 1000, 6),
+    "convolve": (setupConvolve, 1024, 6),
+    "solveDifferentialEquation": (setupDifferentialEquation, 500, 5),
+}
+
+
+def timeFunction(function, repeats = 5, minTime = 0.02):
+    #Times function, returning statistics of the time per call in seconds.
+    #Calls that are much quicker than minTime are looped over so that each
+    #measurement takes at least minTime, as timeit does.  Finding how many
+    #loops are needed also warms up any caches and compilation before the
+    #measurements are taken.
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for i in range(loops):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= minTime:
+            break
+        loops *= 2
+
+    times = np.zeros(repeats)
+    for r in range(repeats):
+        start = time.perf_counter()
+        for i in range(loops):
+            function()
+        times[r] = (time.perf_counter() - start)/loops
+
+    return {
+        "median": float(np.median(times)),
+        "min": float(np.min(times)),
+        "mean": float(np.mean(times)),
+        "std": float(np.std(times)),
+        "loops": loops,
+        "repeats": repeats,
+    }
+
+
+def scalingExponent(sizes, times):
+    #Fits time ~ size^k to the larger half of the sizes, where the fixed
+    #overheads of each call no longer dominate, and returns k.
+    sizes = np.asarray(sizes, dtype = np.float64)
+    times = np.asarray(times, dtype = np.float64)
+    start = len(sizes)//2 if len(sizes) >= 4 else 0
+    return float(np.polyfit(np.log(sizes[start:]), np.log(times[start:]), 1)[0])
+
+
+def runBenchmarks(names = None, quick = False, repeats = 5, seed = 0, log = None):
+    #Runs the named benchmarks (all of them by default) and returns the
+    #results as a dictionary, ready to be saved as JSON.
+    #quick:  only run the smaller half of the sizes
+    #log:  optional function that is called with a line of text as each
+    # size finishes, e.g. print
+    if names is None:
+        names = list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError("Unknown benchmark %r.  The benchmarks are %s" % (name, ", ".join(BENCHMARKS)))
+
+    results = {}
+    for name in names:
+        setup, smallest, count = BENCHMARKS[name]
+        if quick:
+            count = (count + 1)//2
+        sizes = [smallest*pow(2, k) for k in range(count)]
+
+        rng = np.random.default_rng(seed)
+        statistics = []
+        for size in sizes:
+            statistics.append(timeFunction(setup(size, rng), repeats))
+            if log is not None:
+                log("%-28s %10d %12.3e s" % (name, size, statistics[-1]["median"]))
+
+        medians = [s["median"] for s in statistics]
+        results[name] = {
+            "sizes": sizes,
+            "median": medians,
+            "min": [s["min"] for s in statistics],
+            "std": [s["std"] for s in statistics],
+            "loops": [s["loops"] for s in statistics],
+            "exponent": scalingExponent(sizes, medians),
+        }
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+        },
+        "repeats": repeats,
+        "benchmarks": results,
+    }
+
+
+def compareResults(current, baseline, tolerance = 0.25):
+    #Compares two sets of results from runBenchmarks().  For every kernel and
+    #size that both contain, the ratio of the current fastest time to the
+    #baseline's is found.  The fastest time is used rather than the median
+    #since it is the least affected by whatever else the machine is doing.
+    #Returns the list of comparisons and the list of those that are more
+    #than tolerance (as a fraction) slower.
+    comparisons = []
+    for name, result in current["benchmarks"].items():
+        old = baseline["benchmarks"].get(name)
+        if old is None:
+            continue
+        oldTimes = dict(zip(old["sizes"], old["min"]))
+        for size, newTime in zip(result["sizes"], result["min"]):
+            if size in oldTimes:
+                comparisons.append({
+                    "name": name,
+                    "size": size,
+                    "baseline": oldTimes[size],
+                    "current": newTime,
+                    "ratio": newTime/oldTimes[size],
+                })
+
+    regressions = [c for c in comparisons if c["ratio"] > 1 + tolerance]
+    return comparisons, regressions
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description = "Benchmark the numerical kernels of compphys.")
+    parser.add_argument("--output", help = "file to save the results to, as JSON")
+    parser.add_argument("--baseline", help = "results of an earlier run to compare with")
+    parser.add_argument("--tolerance", type = float, default = 0.25,
+        help = "fractional slow-down counted as a regression (default 0.25)")
+    parser.add_argument("--only", nargs = "+", metavar = "NAME", choices = list(BENCHMARKS), help = "benchmarks to run")
+    parser.add_argument("--repeats", type = int, default = 5)
+    parser.add_argument("--quick", action = "store_true", help = "only run the smaller sizes")
+    options = parser.parse_args(argv)
+
+    results = runBenchmarks(options.only, options.quick, options.repeats, log = print)
+
+    print("")
+    print("Scaling exponents (time ~ size^k):")
+    for name, result in results["benchmarks"].items():
+        print("%-28s k = %.2f" % (name, result["exponent"]))
+
+    if options.output is not None:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent = 1)
+
+    if options.baseline is None:
+        return 0
+
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    comparisons, regressions = compareResults(results, baseline, options.tolerance)
+
+    print("")
+    print("Compared with %s:" % options.baseline)
+    for c in comparisons:
+        flag = "  SLOWER" if c in regressions else ""
+        print("%-28s %10d %12.3e s %12.3e s %7.2fx%s" % (c["name"], c["size"], c["baseline"], c["current"], c["ratio"], flag))
+    print("%d of %d timings are more than %d%% slower" % (len(regressions), len(comparisons), round(100*options.tolerance)))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
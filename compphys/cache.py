@@ -0,0 +1,60 @@
+import threading
+from collections import OrderedDict
+
+
+class ByteBudgetCache:
+    '''
+    A thread-safe least recently used cache, limited by the total size of its
+    values rather than their number.  Each value must have an nbytes
+    attribute (numpy arrays, Factorization, ...).  Once the total exceeds the
+    budget (in bytes), the least recently used values are evicted.  A budget
+    of 0 disables caching.
+
+    Cached values are shared between callers, so they should be made
+    read-only before they are stored.
+    '''
+
+    def __init__(self, budget = 64*1024*1024):
+        self.budget = budget
+        self.nbytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self):
+        while self._entries and self.nbytes > self.budget:
+            key, evicted = self._entries.popitem(last = False)
+            self.nbytes -= evicted.nbytes
+
+    def setBudget(self, nbytes):
+        with self._lock:
+            self.budget = nbytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key, compute):
+        #Returns the value cached for key, calling compute() to create (and
+        #cache) it if there isn't one.  compute() is called without holding
+        #the lock, so two threads may both compute the same value, but only
+        #one copy is kept.
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                return cached
+
+        value = compute()
+
+        with self._lock:
+            if key not in self._entries and value.nbytes <= self.budget:
+                self._entries[key] = value
+                self.nbytes += value.nbytes
+                self._evict()
+
+        return value
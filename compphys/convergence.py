@@ -0,0 +1,97 @@
+import numpy as np
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+#Convergence studies: running the same calculation at a range of resolutions
+#(step sizes, numbers of samples, ...) and fitting how quickly the error
+#falls.  Each resolution is independent, so they are run at the same time in
+#a pool of processes.
+
+
+def _timedError(solver, resolution):
+    start = time.perf_counter()
+    error = float(solver(resolution))
+    return error, time.perf_counter() - start
+
+
+class ConvergenceResult:
+    '''
+    The errors found by convergenceStudy(), and the order of accuracy fitted
+    to them.
+
+    resolutions, errors, seconds:  arrays with one entry per resolution, in
+     the order they were given
+    order:  the fitted order p.  For step sizes, the error goes as h^p, and
+     for numbers of samples (or any other resolution where larger is finer)
+     it goes as N^-p.
+    constant:  C in error = C h^p (or C N^-p)
+    localOrders:  the order found from each consecutive pair of resolutions,
+     which shows where the error stops following the fit, e.g. once it
+     reaches the rounding error.
+    '''
+
+    def __init__(self, resolutions, errors, seconds, finerIsSmaller):
+        self.resolutions = np.asarray(resolutions, dtype = np.float64)
+        self.errors = np.asarray(errors, dtype = np.float64)
+        self.seconds = np.asarray(seconds, dtype = np.float64)
+        sign = 1 if finerIsSmaller else -1
+
+        #Errors of exactly zero (or NaN) can't be put on a log scale, so
+        #they are left out of the fit
+        usable = np.isfinite(self.errors) & (self.errors > 0)
+        logResolutions = np.log(self.resolutions[usable])
+        logErrors = np.log(self.errors[usable])
+
+        if np.count_nonzero(usable) >= 2:
+            slope, intercept = np.polyfit(logResolutions, logErrors, 1)
+            self.order = sign*slope
+            self.constant = np.exp(intercept)
+            self.localOrders = sign*np.diff(logErrors)/np.diff(logResolutions)
+        else:
+            self.order = np.nan
+            self.constant = np.nan
+            self.localOrders = np.zeros(0)
+
+    def report(self):
+        #A table of the results, as a string
+        lines = ["%14s %14s %10s" % ("resolution", "error", "seconds")]
+        for resolution, error, seconds in zip(self.resolutions, self.errors, self.seconds):
+            lines.append("%14.6g %14.6e %10.3f" % (resolution, error, seconds))
+        lines.append("Fitted order of accuracy:  %f" % self.order)
+        return "\n".join(lines)
+
+
+def convergenceStudy(solver, resolutions, finerIsSmaller = True, workers = None):
+    #Runs solver(resolution) for every resolution and fits the order of
+    #accuracy to the results.
+    #solver:  function of a single resolution that returns the error of the
+    # solution at that resolution, e.g. the largest difference from an exact
+    # solution.  It is run in other processes, so it must be picklable: a
+    # function defined at the top level of a module, or a functools.partial
+    # of one.
+    #resolutions:  e.g. a list of step sizes
+    #finerIsSmaller:  True if smaller resolutions are more accurate (step
+    # sizes), False if larger ones are (numbers of samples, FFT sizes).
+    #workers:  the number of processes.  None uses one per core, and 0 runs
+    # every resolution in turn in this process.
+    #Returns a ConvergenceResult.
+
+    resolutions = list(resolutions)
+    if len(resolutions) < 2:
+        raise ValueError("A convergence study needs at least two resolutions, got %d" % len(resolutions))
+
+    if workers == 0:
+        results = [_timedError(solver, resolution) for resolution in resolutions]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            #The most expensive (finest) resolutions are started first, so
+            #that the cheap ones fill in around them
+            order = np.argsort(resolutions)
+            if not finerIsSmaller:
+                order = order[::-1]
+            futures = {i: pool.submit(_timedError, solver, resolutions[i]) for i in order}
+            results = [futures[i].result() for i in range(len(resolutions))]
+
+    errors = [error for error, seconds in results]
+    seconds = [seconds for error, seconds in results]
+    return ConvergenceResult(resolutions, errors, seconds, finerIsSmaller)
@@ -0,0 +1,577 @@
+import numpy as np
+from .profiling import instrumented, measureDifferentialEquation
+
+
+
+def RHS_func(t, V_out):
+    #The function f in dx/dt = f(x, t)
+    #This will be provided to solveDifferentialEquation()
+    V0 = 1
+    if t<0:
+        V_in = V0
+    else:
+        V_in = 0
+
+    return V_in/V0 - V_out
+
+def trueSolution(t):
+    #The analytical solution to the equation, which will be used for 
+    #checking the errors.
+    return np.exp(-t)
+
+def RHS_func_2(t, V_out, T):
+    #Another different function for the right hand side of the differential
+    #equation.
+
+    V0 = 1
+
+    #create square wave
+    if t%T < T/2:
+        V_in = 0
+    else:
+        V_in = V0
+    
+    return V_in/V0 - V_out
+
+
+#The following versions of the right hand side functions accept arrays for
+#t, V_out and T, so that many solutions can be advanced together by
+#solveEnsemble().  They give the same values as the functions above.
+
+def RHS_func_vectorized(t, V_out):
+    V0 = 1
+    V_in = np.where(t < 0, V0, 0)
+
+    return V_in/V0 - V_out
+
+def RHS_func_2_vectorized(t, V_out, T):
+    V0 = 1
+
+    #create square wave
+    V_in = np.where(t%T < T/2, 0, V0)
+
+    return V_in/V0 - V_out
+
+def RHS_RC_ladder(t, V_out, T):
+    #A system of equations, for a ladder of len(V_out) identical RC sections
+    #driven by the square wave of RHS_func_2.  V_out[i] is the voltage across
+    #the capacitor of the ith section, and the current through the resistor
+    #joining sections i and i+1 charges capacitor i+1 and discharges capacitor i.
+    #As for the other functions, time is in units of RC and voltages in units of V0.
+
+    V0 = 1
+
+    #create square wave
+    if t%T < T/2:
+        V_in = 0
+    else:
+        V_in = V0
+
+    #The current through each resistor, from the section on its left
+    currents = np.empty_like(V_out)
+    currents[0] = V_in/V0 - V_out[0]
+    currents[1:] = V_out[:-1] - V_out[1:]
+
+    #Each capacitor gains the current from its left and loses the current to its right
+    dV_dt = currents.copy()
+    dV_dt[:-1] -= currents[1:]
+    return dV_dt
+    
+
+
+def _rungeKuttaStep(f, t, x, h, funcArgs, fa = None, tFirst = None, tLast = None):
+    #Takes one step of the 4th order Runge-Kutta method from (t, x).
+    #Returns the new value of x and f(t, x), which Adams-Bashforth reuses.
+    #fa:  f(t, x), if it is already known
+    #tFirst, tLast:  the times at which to evaluate f at the start and end of
+    #the step, if these should differ from t and t + h (see _sideOf()).
+    #Implement equations 8.47 a-e in the lecture notes.
+    if fa is None:
+        fa = f(t if tFirst is None else tFirst, x, *funcArgs)
+    fb = f(t + h/2, x + h*fa/2, *funcArgs)
+    fc = f(t + h/2, x + h*fb/2, *funcArgs)
+    fd = f(t + h if tLast is None else tLast, x + h*fc, *funcArgs)
+
+    return x + (h/6)*(fa + 2*fb + 2*fc + fd), fa
+
+
+def squareWaveBreakpoints(T):
+    #Returns a function giving the times at which the square wave in
+    #RHS_func_2 switches, which are the multiples of T/2.  This can be
+    #passed as the breakpoints argument of solveDifferentialEquation().
+    def breakpoints(tStart, tEnd):
+        first = np.ceil(tStart/(T/2))
+        last = np.floor(tEnd/(T/2))
+        return np.arange(first, last + 1)*(T/2)
+
+    return breakpoints
+
+
+def _breakpointTimes(breakpoints, tStart, tEnd):
+    #Converts the breakpoints argument of solveDifferentialEquation() (None,
+    #a list of times, or a function of (tStart, tEnd) returning one) into a
+    #sorted array of the breakpoints between tStart and tEnd.
+    if breakpoints is None:
+        return np.array([])
+    if callable(breakpoints):
+        breakpoints = breakpoints(tStart, tEnd)
+    times = np.unique(np.asarray(breakpoints, dtype = np.float64))
+    return times[(times >= tStart) & (times <= tEnd)]
+
+
+def _sideOf(t, towards):
+    #f is discontinuous at a breakpoint, so when a step starts or ends on one,
+    #f is evaluated a single floating point number to the side of it that the
+    #step lies on.  This picks up the value of the forcing function on the
+    #correct side of the jump, at no cost to the accuracy of the step.
+    return np.nextafter(t, towards)
+
+
+def _splitRungeKuttaStep(f, t, tNext, x, funcArgs, breakTimes, fa = None):
+    #Takes a Runge-Kutta step from t to tNext that lands exactly on each of the
+    #breakTimes in [t, tNext], so that no stage straddles a discontinuity.
+    #Returns the new value of x and f at the start of the step.
+    interior = breakTimes[(breakTimes > t) & (breakTimes < tNext)]
+    ends = np.append(interior, tNext)
+    startsOnBreak = np.any(breakTimes == t)
+    endsOnBreak = np.any(breakTimes == tNext)
+
+    start = t
+    fStart = None
+    for i, end in enumerate(ends):
+        tFirst = _sideOf(start, end) if (i > 0 or startsOnBreak) else None
+        tLast = _sideOf(end, start) if (i < len(ends) - 1 or endsOnBreak) else None
+        x, fSegment = _rungeKuttaStep(f, start, x, end - start, funcArgs, fa if i == 0 else None, tFirst, tLast)
+        if i == 0:
+            fStart = fSegment
+        start = end
+
+    return x, fStart
+
+
+#Butcher tableau for the Dormand-Prince 5(4) embedded Runge-Kutta method.
+#The 5th order solution is propagated and the difference from the embedded
+#4th order solution estimates the error of each step.
+_DP_C = np.array([0, 1/5, 3/10, 4/5, 8/9, 1])
+_DP_A = [np.array([]),
+         np.array([1/5]),
+         np.array([3/40, 9/40]),
+         np.array([44/45, -56/15, 32/9]),
+         np.array([19372/6561, -25360/2187, 64448/6561, -212/729]),
+         np.array([9017/3168, -355/33, 46732/5247, 49/176, -5103/18656])]
+_DP_B = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84])
+#Difference between the 5th and 4th order weights, including the 7th stage,
+#which is f at the end of the step
+_DP_E = np.array([-71/57600, 0, 71/16695, -71/1920, 17253/339200, -22/525, 1/40])
+#Coefficients of the 4th order continuous extension used for dense output,
+#x(t + theta h) = x + h sum_j k_j sum_p _DP_P[j][p] theta^(p+1)
+_DP_P = np.array([
+    [1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+    [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+    [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+    [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+    [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]])
+
+
+def _errorNorm(error, x, xNew, rtol, atol):
+    #Root mean square of the error relative to the requested tolerances.
+    #A step is acceptable if this is at most 1.
+    scale = atol + rtol*np.maximum(np.abs(x), np.abs(xNew))
+    return np.sqrt(np.mean((error/scale)**2))
+
+
+def _dormandPrince(f, x0, tValues, funcArgs, rtol, atol, maxStep, breakTimes, statistics = None):
+    #Adaptive step size solution using the Dormand-Prince method.  The steps
+    #are chosen to meet the tolerances, independently of tValues, and the
+    #solution at each of tValues is then found from the dense output of the
+    #step that contains it.  Steps are shortened to land exactly on each of
+    #breakTimes, so that the step size only has to shrink at a discontinuity
+    #if it was not registered as a breakpoint.
+    #statistics:  optional dictionary, which is given the numbers of accepted
+    # and rejected steps.
+    stateShape = np.shape(x0)
+    xValues = np.zeros((len(tValues),) + stateShape)
+    xValues[0] = x0
+
+    t = tValues[0]
+    tEnd = tValues[-1]
+    x = np.array(x0, dtype = np.float64)
+    k = np.zeros((7,) + stateShape)
+    onBreak = len(breakTimes) > 0 and breakTimes[0] == t
+    k[0] = f(_sideOf(t, tEnd) if onBreak else t, x, *funcArgs)
+
+    #The next breakpoint to land on
+    nextBreak = np.searchsorted(breakTimes, t, side = "right")
+
+    #Initial step size, from the rough scale of x and its derivative
+    #(Hairer, Norsett and Wanner, Solving ODEs I, section II.4)
+    scale = atol + rtol*np.abs(x)
+    d0 = np.sqrt(np.mean((x/scale)**2))
+    d1 = np.sqrt(np.mean((k[0]/scale)**2))
+    h = 1e-6 if (d0 < 1e-5 or d1 < 1e-5) else 0.01*d0/d1
+
+    acceptedSteps = 0
+    rejectedSteps = 0
+    nextOutput = 1
+    while nextOutput < len(tValues):
+        #Don't step past the next breakpoint, or the end
+        target = breakTimes[nextBreak] if nextBreak < len(breakTimes) else tEnd
+        h = min(h, maxStep, target - t)
+        #Stop the step exactly on the target if it is close
+        landsOnTarget = target - t - h <= 1e-12*abs(target)
+        if landsOnTarget:
+            h = target - t
+        landsOnBreak = landsOnTarget and nextBreak < len(breakTimes)
+
+        stageTimes = t + _DP_C*h
+        tLast = t + h
+        if landsOnBreak:
+            tLast = _sideOf(target, t)
+            stageTimes[5] = tLast
+
+        for stage in range(1, 6):
+            xStage = x + h*np.tensordot(_DP_A[stage], k[:stage], axes = 1)
+            k[stage] = f(stageTimes[stage], xStage, *funcArgs)
+        xNew = x + h*np.tensordot(_DP_B, k[:6], axes = 1)
+        k[6] = f(tLast, xNew, *funcArgs)
+
+        errorNorm = _errorNorm(h*np.tensordot(_DP_E, k, axes = 1), x, xNew, rtol, atol)
+        if not np.isfinite(errorNorm):
+            #Shrinking the step can't help if f has returned NaN or inf
+            raise Exception("The Dormand-Prince method failed at t = %s:  f returned a value that is not finite" % t)
+
+        if errorNorm <= 1:
+            acceptedSteps += 1
+            tNew = target if landsOnTarget else t + h
+            #Fill in every requested output inside this step from the dense output
+            Q = np.tensordot(_DP_P, k, axes = (0, 0))
+            while nextOutput < len(tValues) and tValues[nextOutput] <= tNew:
+                theta = (tValues[nextOutput] - t)/h
+                powers = np.cumprod(np.full(4, theta))
+                xValues[nextOutput] = x + h*np.tensordot(powers, Q, axes = 1)
+                nextOutput += 1
+
+            t = tNew
+            x = xNew
+            if landsOnBreak:
+                #f jumps here, so the last stage can't be reused
+                nextBreak += 1
+                k[0] = f(_sideOf(t, tEnd), x, *funcArgs)
+            else:
+                #First Same As Last:  the 7th stage is f at the start of the next step
+                k[0] = k[6]
+        else:
+            rejectedSteps += 1
+
+        #Standard step size controller, with a safety factor and limits on
+        #how quickly the step may change
+        if errorNorm == 0:
+            factor = 10
+        else:
+            factor = min(10, max(0.2, 0.9*errorNorm**(-1/5)))
+        if errorNorm > 1:
+            factor = min(factor, 1)
+        h = h*factor
+
+        #As in scipy's RK45, give up once the step is too small to change t
+        #by more than a few rounding errors
+        if errorNorm > 1 and h < 10*np.abs(np.nextafter(t, tEnd) - t):
+            raise Exception("The Dormand-Prince method failed at t = %s:  the step size needed to meet the tolerances is too small" % t)
+
+    if statistics is not None:
+        statistics["acceptedSteps"] = acceptedSteps
+        statistics["rejectedSteps"] = rejectedSteps
+    return xValues
+
+
+class RHS:
+    '''
+    Wraps a right hand side function f(t, x, *funcArgs) with information
+    about how the solvers may call it.
+
+    vectorized:  f accepts arrays of t and x (and of its other arguments) and
+        works elementwise, like RHS_func_2_vectorized.  Many points can then
+        be evaluated in a single call:  solveEnsemble() advances every member
+        of the ensemble with one call per stage, and inputSchedule() samples
+        every piece of the input at once.  Without it, solveEnsemble() calls
+        f separately for each member.
+    compile:  compile f with an accelerator (currently numba) if one is
+        installed.  The fixed step solvers then run their whole time loop as
+        compiled code, rather than calling back into Python for every stage
+        of every step.  If no accelerator is available f is used as it is,
+        and the compiled attribute is False.
+    '''
+
+    def __init__(self, f, vectorized = False, compile = False):
+        self.function = f
+        self.vectorized = vectorized
+        self.compiled = False
+
+        if compile:
+            accelerator = _getAccelerator()
+            if accelerator is not None:
+                self.function = accelerator.njit(f)
+                self.compiled = True
+
+    def __call__(self, t, x, *funcArgs):
+        return self.function(t, x, *funcArgs)
+
+
+_accelerator = None
+_acceleratorChecked = False
+_compiledKernels = {}
+
+
+def _getAccelerator():
+    #numba is optional, and is only imported the first time it is needed.
+    global _accelerator, _acceleratorChecked
+    if not _acceleratorChecked:
+        _acceleratorChecked = True
+        try:
+            import numba
+            _accelerator = numba
+        except ImportError:
+            _accelerator = None
+    return _accelerator
+
+
+def _rungeKuttaKernel(f, tValues, xValues, h, funcArgs):
+    #The Runge-Kutta time loop, written so that it can be compiled along
+    #with f.  x may be a scalar or a vector.
+    for i in range(len(tValues) - 1):
+        t = tValues[i]
+        x = xValues[i]
+        fa = f(t, x, *funcArgs)
+        fb = f(t + h/2, x + h*fa/2, *funcArgs)
+        fc = f(t + h/2, x + h*fb/2, *funcArgs)
+        fd = f(t + h, x + h*fc, *funcArgs)
+        xValues[i+1] = x + (h/6)*(fa + 2*fb + 2*fc + fd)
+
+
+def _adamsBashforthKernel(f, tValues, xValues, h, funcArgs):
+    #The Adams-Bashforth time loop, started with three Runge-Kutta steps,
+    #written so that it can be compiled along with f.  x may be a scalar or
+    #a vector.
+    history = np.zeros((4,) + xValues.shape[1:])
+    for i in range(len(tValues) - 1):
+        t = tValues[i]
+        x = xValues[i]
+        fa = f(t, x, *funcArgs)
+        history[i % 4] = fa
+        if i < 3:
+            fb = f(t + h/2, x + h*fa/2, *funcArgs)
+            fc = f(t + h/2, x + h*fb/2, *funcArgs)
+            fd = f(t + h, x + h*fc, *funcArgs)
+            xValues[i+1] = x + (h/6)*(fa + 2*fb + 2*fc + fd)
+        else:
+            xValues[i+1] = x + (h/24)*(55*fa - 59*history[(i-1) % 4] + 37*history[(i-2) % 4] - 9*history[(i-3) % 4])
+
+
+def _compiledKernel(kernel):
+    if kernel not in _compiledKernels:
+        _compiledKernels[kernel] = _getAccelerator().njit(kernel)
+    return _compiledKernels[kernel]
+
+
+@instrumented(measureDifferentialEquation)
+def solveDifferentialEquation(f, x0, tValues, method, *funcArgs, rtol = 1e-6, atol = 1e-9, maxStep = np.inf, breakpoints = None, statistics = None):
+    #f: the function on the right hand side of the differential equation when 
+    # it is of the form dx/dt = f(x, t)
+    #x0:  the initial value for x at the first time value.
+    #tValues:  The time values to solve over
+    #method signifies which method to use
+        #method = 1 means use 4th order Runge Kutta method
+        #method = 2 means use 4th order Adams-Bashforth method
+        #method = 3 means use the adaptive Dormand-Prince (RK45) method
+    #*funcArgs:  Any additional arguments required for f.
+    #x0 may also be an array, in which case f must accept and return arrays of
+    #the same shape, and xValues[i] is the whole state at tValues[i].  For a
+    #system of d coupled equations (such as RHS_RC_ladder) x0 has shape (d,)
+    #and the solution has shape (len(tValues), d).
+    #rtol, atol:  relative and absolute error tolerances for method 3
+    #maxStep:  the largest step method 3 may take
+    #breakpoints:  times at which f is discontinuous, e.g. where a square wave
+    # switches.  Either a list of times, or a function of (tStart, tEnd) that
+    # returns them, such as squareWaveBreakpoints(T).  Every method steps
+    # exactly onto each breakpoint, and Adams-Bashforth restarts its history
+    # there, so the discontinuities don't cost any accuracy.
+    #f may be given as an RHS object.  If it has been compiled, methods 1 and 2
+    #run as compiled loops when x is a scalar or vector and there are no
+    #breakpoints.
+    #statistics:  optional dictionary.  Method 3 stores the numbers of steps
+    # it accepted and rejected in it, as "acceptedSteps" and "rejectedSteps".
+
+    breakTimes = _breakpointTimes(breakpoints, tValues[0], tValues[-1])
+
+    #Methods 1 and 2 use a fixed step, taken from the spacing of tValues.
+    #Method 3 chooses its own steps, so tValues need not be evenly spaced.
+    if method == 3:
+        return _dormandPrince(f, x0, tValues, funcArgs, rtol, atol, maxStep, breakTimes, statistics)
+    
+    h = tValues[1] - tValues[0]
+    nSteps = len(tValues) - 1
+
+    #The solution array is allocated once and filled in as we go
+    stateShape = np.shape(x0)
+    xValues = np.zeros((len(tValues),) + stateShape)
+    xValues[0] = x0
+
+    if isinstance(f, RHS) and f.compiled and len(stateShape) <= 1 and len(breakTimes) == 0 and method in (1, 2):
+        kernel = _rungeKuttaKernel if method == 1 else _adamsBashforthKernel
+        _compiledKernel(kernel)(f.function, np.asarray(tValues, dtype = np.float64), xValues, h, funcArgs)
+        return xValues
+
+    #For each step i, breakTimes[firstBreak[i]:lastBreak[i]] are the
+    #breakpoints in [tValues[i], tValues[i+1]].  Steps without any are
+    #taken as normal.
+    firstBreak = np.searchsorted(breakTimes, tValues[:-1], side = "left")
+    lastBreak = np.searchsorted(breakTimes, tValues[1:], side = "right")
+    hasBreak = firstBreak < lastBreak
+
+    if method == 1:
+        #Runge-Kutta
+        for i in range(nSteps):
+            if hasBreak[i]:
+                xValues[i+1], fa = _splitRungeKuttaStep(f, tValues[i], tValues[i+1], xValues[i], funcArgs, breakTimes[firstBreak[i]:lastBreak[i]])
+            else:
+                xValues[i+1], fa = _rungeKuttaStep(f, tValues[i], xValues[i], h, funcArgs)
+
+    else:
+        #Adams-Bashforth
+        #Since Adams-Bashforth is a multi-step method, we need to get some 
+        #starting values.  It's fourth order, so we can only start iterating
+        #at index i = 3.
+        #We therefore need values with index 0, 1, 2 and 3 from a different method.
+        #We will reuse the Runge-Kutta method given above.
+
+        #The last four values of f are kept in a ring buffer, with f at index i
+        #stored in position i % 4.  Each step then only needs one new call to f.
+        #validHistory counts how many of them were found since the last
+        #breakpoint, since values from before a discontinuity can't be used.
+        history = np.zeros((4,) + stateShape)
+        validHistory = 0
+        for i in range(nSteps):
+            t = tValues[i]
+            startsOnBreak = hasBreak[i] and breakTimes[firstBreak[i]] == t
+            history[i % 4] = f(_sideOf(t, tValues[i+1]) if startsOnBreak else t, xValues[i], *funcArgs)
+            validHistory += 1
+
+            if hasBreak[i] and breakTimes[lastBreak[i] - 1] > t:
+                #A breakpoint is inside this step or at its end, so step onto it
+                #with Runge-Kutta and start collecting history again afterwards.
+                xValues[i+1], fa = _splitRungeKuttaStep(f, t, tValues[i+1], xValues[i], funcArgs, breakTimes[firstBreak[i]:lastBreak[i]], history[i % 4])
+                validHistory = 0
+
+            elif validHistory < 4:
+                #Not enough history yet, so use Runge-Kutta for the starting values
+                xValues[i+1], fa = _rungeKuttaStep(f, t, xValues[i], h, funcArgs, history[i % 4])
+
+            else:
+                #Now that the start values have been found, we can continue with the AB method
+                #as described in the lecture notes.
+                #Implement equations 8.24 and 8.25 in the lecture notes
+                fa = history[i % 4]
+                fb = history[(i-1) % 4]
+                fc = history[(i-2) % 4]
+                fd = history[(i-3) % 4]
+
+                xValues[i+1] = xValues[i] + (h/24)*(55*fa - 59*fb + 37*fc - 9*fd)
+
+    return xValues
+
+
+def solveEnsemble(f, x0, tValues, method, *funcArgs, **options):
+    #Solves the same differential equation for many initial values and/or
+    #parameter values at once.  x0 and any of funcArgs may be arrays, and
+    #they are broadcast together, so that each element of the result is a
+    #separate solution.  All of the solutions are advanced by a single time
+    #loop, with f evaluated on whole arrays, so a plain function f must be
+    #array-aware (e.g. RHS_func_2_vectorized rather than RHS_func_2).  If f is
+    #an RHS that isn't marked as vectorized, it is instead called for each
+    #member of the ensemble in turn.
+    #Returns an array of shape (len(tValues),) + the broadcast shape.
+    #**options are passed on to solveDifferentialEquation().
+
+    shape = np.broadcast(x0, *funcArgs).shape
+    x0 = np.array(np.broadcast_to(x0, shape), dtype = np.float64)
+    funcArgs = [np.broadcast_to(arg, shape) for arg in funcArgs]
+
+    if isinstance(f, RHS) and not f.vectorized:
+        scalarFunction = f.function
+        def f(t, x, *funcArgs):
+            result = np.empty(np.shape(x))
+            for index in np.ndindex(np.shape(x)):
+                result[index] = scalarFunction(t, x[index], *(arg[index] for arg in funcArgs))
+            return result
+
+    return solveDifferentialEquation(f, x0, tValues, method, *funcArgs, **options)
+
+
+def inputSchedule(f, switchTimes, *funcArgs):
+    #Finds the piecewise constant input u(t) of a linear equation of the form
+    #dx/dt = u(t) - kx, such as RHS_func or RHS_func_2, given the times at
+    #which u switches.  Since u(t) = f(t, 0), f is sampled once inside each
+    #constant piece.
+    #Returns (switchTimes, inputValues), where inputValues[j] is the input
+    #between switchTimes[j-1] and switchTimes[j].  inputValues[0] applies
+    #before the first switch and inputValues[-1] after the last.
+    switchTimes = np.unique(np.asarray(switchTimes, dtype = np.float64))
+    if len(switchTimes) == 0:
+        raise Exception("At least one switch time is needed")
+
+    sampleTimes = np.concatenate((
+        [_sideOf(switchTimes[0], -np.inf)],
+        (switchTimes[:-1] + switchTimes[1:])/2,
+        [_sideOf(switchTimes[-1], np.inf)]))
+    if getattr(f, "vectorized", False):
+        inputValues = np.array(f(sampleTimes, 0, *funcArgs), dtype = np.float64)
+    else:
+        inputValues = np.array([f(t, 0, *funcArgs) for t in sampleTimes], dtype = np.float64)
+
+    return switchTimes, inputValues
+
+
+def solveLinearDifferentialEquation(k, schedule, x0, tValues):
+    #Solves dx/dt = u(t) - kx exactly, when the input u(t) is piecewise
+    #constant.  This is the form of the RC circuit equation, with k = 1 and
+    #u = V_in/V0.
+    #k:  the decay rate
+    #schedule:  (switchTimes, inputValues) describing u(t), as returned by
+    # inputSchedule()
+    #x0:  the value of x at tValues[0]
+    #tValues:  the (increasing) times at which to find x
+
+    #Over any interval of length dt in which u is constant, the solution is
+    #    x(t + dt) = x(t) e^(-k dt) + u (1 - e^(-k dt))/k
+    #so x can be propagated exactly from one switch to the next, and then to
+    #every requested time at once.
+    def propagate(x, u, dt):
+        if k == 0:
+            return x + u*dt
+        return x*np.exp(-k*dt) - u*np.expm1(-k*dt)/k
+
+    switchTimes, inputValues = schedule
+    switchTimes = np.asarray(switchTimes, dtype = np.float64)
+    inputValues = np.asarray(inputValues, dtype = np.float64)
+    tValues = np.asarray(tValues, dtype = np.float64)
+    tStart = tValues[0]
+
+    #Split the time range into pieces on which u is constant
+    inside = (switchTimes > tStart) & (switchTimes <= tValues[-1])
+    pieceStarts = np.concatenate(([tStart], switchTimes[inside]))
+    pieceInputs = inputValues[np.searchsorted(switchTimes, pieceStarts, side = "right")]
+
+    #x at the start of each piece.  This recurrence is the only sequential
+    #part, and it has one step per switch rather than per time value.
+    pieceDurations = np.diff(pieceStarts)
+    pieceStates = np.zeros((len(pieceStarts),) + np.shape(x0))
+    pieceStates[0] = x0
+    for j in range(len(pieceDurations)):
+        pieceStates[j+1] = propagate(pieceStates[j], pieceInputs[j], pieceDurations[j])
+
+    #Every requested time is then found from the start of its piece
+    piece = np.searchsorted(pieceStarts, tValues, side = "right") - 1
+    dt = (tValues - pieceStarts[piece]).reshape((-1,) + (1,)*np.ndim(x0))
+    return propagate(pieceStates[piece], pieceInputs[piece].reshape(dt.shape), dt)
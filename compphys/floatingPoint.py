@@ -0,0 +1,67 @@
+import numpy as np
+
+def findNearestNumbers(x):
+    '''
+    This function finds the nearest representable real numbers higher (upperNumber) 
+    and lower (lowerNumber) than a given floating point value, x.
+
+    The fractional range (the difference between the two numbers divided by x
+    is also returned.
+
+    x may be a single value or an array of float16, float32 or float64 values
+    (anything else is treated as float64), and the neighbours are found in the
+    same precision.  The fractional ranges are always float64, and are NaN for
+    x = 0, where they cannot be computed.  Zero, subnormal numbers and
+    infinities are all handled, and NaN gives NaN.
+    '''
+
+    x = np.asarray(x)
+    if x.dtype not in (np.float16, np.float32, np.float64):
+        x = x.astype(np.float64)
+
+    #Rather than searching for the neighbours, read them straight from the
+    #IEEE-754 bit layout.  Viewing the buffer as unsigned integers of the
+    #same width costs nothing.  Ignoring the sign bit, consecutive integers
+    #are consecutive representable magnitudes, from 0 through the subnormal
+    #and normal numbers up to infinity.
+    bits = 8*x.dtype.itemsize
+    unsignedType = np.dtype("uint%d" % bits)
+    signBit = unsignedType.type(1 << (bits - 1))
+    infinityBits = np.array(np.inf, dtype = x.dtype).view(unsignedType)
+
+    raw = x.view(unsignedType)
+    magnitude = (raw & ~signBit).astype(np.int64)
+    negative = (raw & signBit) != 0
+
+    #Number every representable value in order, with +0 and -0 both 0, so
+    #that the neighbours are simply one above and one below.  They can't go
+    #past the infinities.
+    ordered = np.where(negative, -magnitude, magnitude)
+    limit = np.int64(infinityBits)
+    upperOrdered = np.minimum(ordered + 1, limit)
+    lowerOrdered = np.maximum(ordered - 1, -limit)
+
+    def fromOrdered(o):
+        #Convert back from the ordering to the bit layout, and view as floats
+        raw = np.where(o < 0, signBit | np.abs(o).astype(unsignedType), o.astype(unsignedType))
+        return raw.astype(unsignedType).view(x.dtype)
+
+    upperNumber = np.where(np.isnan(x), x, fromOrdered(upperOrdered))
+    lowerNumber = np.where(np.isnan(x), x, fromOrdered(lowerOrdered))
+
+    #now compute fractional rounding ranges.
+    #Must halve the values because they are for rounding.
+    #Neighbouring floats differ by a power of 2 that is exactly representable
+    #in float64, so the differences are exact.  Halving the difference itself
+    #would underflow to 0 for the subnormals (and the smallest normal), where
+    #it is the smallest float, so the division is done first.
+    x64 = x.astype(np.float64)
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        lowerFractionalRange = 0.5*((lowerNumber.astype(np.float64) - x64)/x64)
+        upperFractionalRange = 0.5*((upperNumber.astype(np.float64) - x64)/x64)
+    lowerFractionalRange = np.where(x64 == 0, np.nan, lowerFractionalRange)
+    upperFractionalRange = np.where(x64 == 0, np.nan, upperFractionalRange)
+
+    if np.ndim(x) == 0:
+        return lowerNumber[()], upperNumber[()], lowerFractionalRange[()], upperFractionalRange[()]
+    return lowerNumber, upperNumber, lowerFractionalRange, upperFractionalRange
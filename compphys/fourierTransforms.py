@@ -0,0 +1,223 @@
+import numpy as np
+from .cache import ByteBudgetCache
+
+def signalFunc(t):
+    #The signal function as defined in the question.
+    #t may be a single value or an array.
+    return np.where((t>=5) & (t<=7), 4, 0)
+    
+def responseFunc(t):
+    #The gaussian response function as defined in the question
+    return (1/np.sqrt(2*np.pi))*np.exp(-pow(t, 2)/4)
+
+
+def nextFastLength(n):
+    #Returns the smallest number >= n with no prime factors other than 2, 3
+    #and 5.  FFTs of these lengths are much faster than for lengths with
+    #large prime factors, and they are far denser than the powers of 2.
+    best = 2*n
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            #Smallest power of 2 that takes power35 up to at least n
+            length = power35
+            while length < n:
+                length *= 2
+            best = min(best, length)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+#Spectra of sampled response functions, and frequency grids, are cached so
+#that convolving many signals with the same response only transforms the
+#response once.  As with the factorisation cache in matrixFunctions, the
+#least recently used entries are evicted once the total size of the cached
+#arrays exceeds the budget (in bytes).
+_spectrumCache = ByteBudgetCache(64*1024*1024)
+
+
+def setSpectrumCacheBudget(nbytes):
+    #Sets the maximum total size of the cached spectra.  A budget of 0
+    #disables caching.
+    _spectrumCache.setBudget(nbytes)
+
+
+def clearSpectrumCache():
+    _spectrumCache.clear()
+
+
+def _cached(key, compute):
+    #Returns the cached array for key, calling compute() to create it if it
+    #isn't in the cache.  Cached arrays are shared, so they are read-only.
+    def computeReadOnly():
+        result = compute()
+        result.setflags(write = False)
+        return result
+
+    return _spectrumCache.get(key, computeReadOnly)
+
+
+def kernelSpectrum(response, halfWidth, spacing, fftLength):
+    #The real FFT, of length fftLength, of the response sampled at the
+    #2*halfWidth + 1 lags from -halfWidth to halfWidth times the spacing.
+    #Cached on the identity of the response function and the other arguments.
+    def compute():
+        lags = (np.arange(2*halfWidth + 1) - halfWidth)*spacing
+        return np.fft.rfft(np.asarray(response(lags), dtype = np.float64), fftLength)
+
+    return _cached(("spectrum", response, halfWidth, spacing, fftLength), compute)
+
+
+def angularFrequencies(N, spacing):
+    #The angular frequencies of the entries of an N point FFT of samples with
+    #the given spacing, including the 2pi scaling.  Cached.
+    return _cached(("frequencies", N, spacing), lambda: 2*np.pi*np.fft.fftfreq(N, spacing))
+
+
+def convolve(signal, response, t_range, N):
+    #Finds the convolution (signal * response)(t) at N evenly spaced times
+    #covering t_range = (tStart, tEnd).
+    #signal, response:  functions of t, which must accept arrays of t
+    #Returns the times and the (real) values of the convolution.
+
+    tValues = np.linspace(t_range[0], t_range[1], N)
+    spacing = tValues[1] - tValues[0]
+
+    #Sample the signal in a single vectorised call.  The convolution at t_i
+    #needs the response at every difference t_i - t_j, so the response is
+    #sampled at all lags from -(N-1) to (N-1) times the spacing.
+    signal_y = np.asarray(signal(tValues), dtype = np.float64)
+
+    #Both functions are real, so the real FFT is used, which only computes the
+    #non-negative frequencies and so takes about half the time and memory.
+    #The FFTs are zero padded to at least 2N-1 points.  The product of the
+    #transforms is then a circular convolution, whose wrap-around only affects
+    #outputs outside the N that are needed, so the result is the linear
+    #convolution rather than one aliased with copies of the signal.
+    #The response's spectrum is cached, so repeated convolutions with the
+    #same response only need one forward and one inverse transform.
+    length = nextFastLength(2*N - 1)
+    F_signal = np.fft.rfft(signal_y, length)
+    F_response = kernelSpectrum(response, N - 1, spacing, length)
+    convolution = np.fft.irfft(F_signal*F_response, length)
+
+    #Entry N-1+i of the full convolution corresponds to time t_i, and the
+    #spacing accounts for the scaling detailed in the lecture notes.
+    return tValues, convolution[N-1:2*N-1]*spacing
+
+
+def kernelHalfWidth(response, spacing, tolerance = 1e-12, maxHalfWidth = 1 << 20):
+    #Finds how many samples either side of t = 0 are needed to hold the
+    #response, by doubling the width until the response at the edge has
+    #fallen below tolerance times its peak.
+    #maxHalfWidth:  the widest response allowed.  Responses that never fall
+    # off (e.g. a constant) or decay too slowly raise a ValueError rather
+    # than doubling forever.
+    peak = np.max(np.abs(response(np.array([-spacing, 0, spacing]))))
+    K = 1
+    while np.max(np.abs(response(np.array([-K, K])*spacing))) > tolerance*peak:
+        if K >= maxHalfWidth:
+            raise ValueError("The response has not fallen below %g of its peak within %d samples of t = 0.  "
+                "Give the half width explicitly if it really is this wide." % (tolerance, maxHalfWidth))
+        K *= 2
+    return K
+
+
+class OverlapAddConvolver:
+    '''
+    Convolves a signal that arrives a piece at a time with a fixed response
+    (such as the Gaussian responseFunc), using the overlap-add method.
+
+    The response is sampled at lags -K to K samples, and its spectrum is
+    computed once.  Incoming samples are gathered into blocks of blockSize,
+    each block is convolved with the response using one forward and one
+    inverse FFT, and the part of each result that spills past the end of its
+    block is added onto the start of the next one.  Memory use is constant,
+    and each output is available at most blockSize + K samples after the
+    corresponding input.
+
+    The output sample i is the convolution at the time of input sample i,
+    scaled by the spacing as in convolve(), so a whole record processed this
+    way matches convolve() to within the truncation of the response.
+    '''
+
+    def __init__(self, response, spacing, blockSize = 4096, halfWidth = None):
+        #response:  function of t, which must accept arrays of t
+        #spacing:  the time between samples of the signal
+        #halfWidth:  K, the number of samples either side of t = 0 at which
+        # the response is non-negligible.  Found automatically if not given.
+        if halfWidth is None:
+            halfWidth = kernelHalfWidth(response, spacing)
+        K = halfWidth
+        self.blockSize = blockSize
+        self.halfWidth = K
+
+        self.fftLength = nextFastLength(blockSize + 2*K)
+        self.F_kernel = kernelSpectrum(response, K, spacing, self.fftLength)*spacing
+
+        self._block = np.zeros(blockSize)
+        self._blockFilled = 0
+        #The part of the convolution that has spilled past the blocks so far
+        self._overlap = np.zeros(2*K)
+        #Entries of the full convolution before index K come before the first
+        #input sample, and are not part of the output.
+        self._toDiscard = K
+
+    def _emit(self, values):
+        discard = min(self._toDiscard, len(values))
+        self._toDiscard -= discard
+        return values[discard:]
+
+    def _convolveBlock(self, block):
+        K = self.halfWidth
+        result = np.fft.irfft(np.fft.rfft(block, self.fftLength)*self.F_kernel, self.fftLength)
+        result = result[:len(block) + 2*K]
+        result[:2*K] += self._overlap
+
+        #Everything before the end of this block is now complete
+        self._overlap = result[len(block):].copy()
+        return self._emit(result[:len(block)])
+
+    def process(self, chunk):
+        #Adds some more samples of the signal, and returns the output samples
+        #that are now complete (possibly none).
+        chunk = np.asarray(chunk, dtype = np.float64).reshape(-1)
+        outputs = []
+        start = 0
+        while start < len(chunk):
+            count = min(self.blockSize - self._blockFilled, len(chunk) - start)
+            self._block[self._blockFilled:self._blockFilled + count] = chunk[start:start + count]
+            self._blockFilled += count
+            start += count
+
+            if self._blockFilled == self.blockSize:
+                outputs.append(self._convolveBlock(self._block))
+                self._blockFilled = 0
+
+        return np.concatenate(outputs) if outputs else np.zeros(0)
+
+    def flush(self):
+        #Call once the signal has ended, to get the remaining output samples.
+        #The signal is taken to be zero after its last sample.  The convolver
+        #is then ready to start on a new signal.
+        outputs = [self._convolveBlock(self._block[:self._blockFilled])]
+        outputs.append(self._emit(self._overlap[:self.halfWidth]))
+
+        self._blockFilled = 0
+        self._overlap = np.zeros(2*self.halfWidth)
+        self._toDiscard = self.halfWidth
+        return np.concatenate(outputs)
+
+
+def convolveStream(chunks, response, spacing, blockSize = 4096, halfWidth = None):
+    #Generator that convolves a signal, given as an iterable of arrays of
+    #samples, with response, yielding the output as it becomes available.
+    #See OverlapAddConvolver.
+    convolver = OverlapAddConvolver(response, spacing, blockSize, halfWidth)
+    for chunk in chunks:
+        output = convolver.process(chunk)
+        if len(output) > 0:
+            yield output
+    yield convolver.flush()
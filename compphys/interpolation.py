@@ -0,0 +1,276 @@
+import numpy as np
+from . import matrixFunctions as m
+
+class BarycentricInterpolator:
+    '''
+    The Lagrange interpolating polynomial through a set of data points, stored
+    in barycentric form so that it can be evaluated cheaply many times.
+
+    Equation 4.2 of the lecture notes can be rewritten as
+
+        p(x) = sum_i (w_i y_i/(x - x_i)) / sum_i (w_i/(x - x_i))
+
+    with the barycentric weights w_i = 1/prod_{j != i}(x_i - x_j).  The
+    weights only depend on the data, so they are found once in O(n^2), and
+    each evaluation then costs O(n) rather than O(n^2).
+    '''
+
+    def __init__(self, data):
+        #data is a 2D array of values, of shape (2, n) where n is the number of data points.
+        self.x = np.array(data[0], dtype = np.float64)
+        self.y = np.array(data[1], dtype = np.float64)
+        if len(self.x) != len(self.y):
+            raise Exception("The arrays of x and y data must have the same length")
+
+        #The products of differences underflow (or overflow) for more than a
+        #few hundred points, even part way through the product, so the
+        #weights are kept as the logs of their magnitudes and their signs.
+        #Scaling every weight by the same factor doesn't change p(x), so
+        #they are then scaled so that the largest is 1.
+        differences = self.x[:, np.newaxis] - self.x[np.newaxis, :]
+        np.fill_diagonal(differences, 1)
+        self._logWeights = -np.sum(np.log(np.abs(differences)), axis = 1)
+        self._signs = np.prod(np.sign(differences), axis = 1)
+        self._setWeights()
+
+    def _setWeights(self):
+        largest = np.max(self._logWeights) if len(self._logWeights) else 0
+        self.weights = self._signs*np.exp(self._logWeights - largest)
+
+    def addKnot(self, x, y):
+        #Adds the data point (x, y), updating the weights in O(n)
+        #rather than recomputing them all.
+        differences = self.x - x
+        if np.any(differences == 0):
+            raise Exception("There is already a data point at x = %s" % x)
+        logDifferences = np.log(np.abs(differences))
+        self._logWeights = np.append(self._logWeights - logDifferences, -np.sum(logDifferences))
+        self._signs = np.append(self._signs*np.sign(differences), np.prod(-np.sign(differences)))
+        self._setWeights()
+        self.x = np.append(self.x, x)
+        self.y = np.append(self.y, y)
+
+    def __call__(self, xValues, chunkSize = 1 << 20):
+        #Evaluates the polynomial at every point in xValues.  The points are
+        #processed in blocks, so that the (points x data points) work array
+        #never has more than about chunkSize elements.
+        xValues = np.asarray(xValues, dtype = np.float64)
+        yValues = np.empty(np.shape(xValues))
+        flatX = xValues.reshape(-1)
+        flatY = yValues.reshape(-1)
+
+        rowsPerChunk = max(1, chunkSize//len(self.x))
+        for start in range(0, len(flatX), rowsPerChunk):
+            chunk = flatX[start:start + rowsPerChunk]
+            differences = chunk[:, np.newaxis] - self.x[np.newaxis, :]
+
+            #Points that land exactly on a data point would divide by zero,
+            #so they are given that data point's value directly.
+            exact = differences == 0
+            differences[exact] = 1
+            terms = self.weights/differences
+            result = (terms @ self.y)/np.sum(terms, axis = 1)
+
+            hitRows, hitColumns = np.nonzero(exact)
+            result[hitRows] = self.y[hitColumns]
+            flatY[start:start + rowsPerChunk] = result
+
+        return yValues
+
+
+def lagrangeInterpolation(data, xValues):
+    #data is a 2D array of values, of shape (2, n) where n is the number of data points.
+    #These will be used to calculate the interpolation.
+    #xValues is the array of values that you wish to know the y values of, based on the 
+    #interpolation.
+
+    #This evaluates the equation for Lagrange interpolation given in section 4.4 of the
+    #lecture notes (equation 4.2), using its barycentric form.  To evaluate the
+    #same interpolation repeatedly, create a BarycentricInterpolator once and call it.
+    return BarycentricInterpolator(data)(xValues)
+
+
+
+
+class CubicSpline:
+    '''
+    A natural cubic spline through a set of data points.  The system for the
+    second derivatives is solved once, when the spline is created, and the
+    spline is then stored as a cubic polynomial on each interval:
+
+        y = c0 + c1 t + c2 t^2 + c3 t^3,    t = x - x[i]  for x[i] <= x < x[i+1]
+
+    The coefficients are kept in one contiguous (4, n) array, so evaluating,
+    differentiating or integrating the spline never repeats the solve.  Splines
+    can be pickled, or saved with save() and reloaded quickly with load().
+    '''
+
+    def __init__(self, data):
+        #data:      x values in zeroth row, y values in 1st row
+
+        #For the cubic spline, we require more than three points for the function to work.
+        if len(data[0]) <= 3:
+            raise Exception("There is an insufficient number data points to plot a cubic spline")
+        #Lengths of x and y in data arrays must match
+        if len(data[0]) != len(data[1]):
+            raise Exception("The arrays of x and y data must have the same length")
+
+        x = np.array(data[0], dtype = np.float64)
+        y = np.array(data[1], dtype = np.float64)
+        n = len(x) - 1
+
+        #First find the second derivatives.  To do this, we implement equation 4.15 in 
+        #section 4.5 of the lecture notes as a matrix equation.
+
+        #The matrix is tridiagonal, so only its three diagonals are stored.  Row
+        #i - 1 of the matrix corresponds to index i in the lecture notes, for i
+        #from 1 to n - 1.  The first and last rows only have two elements, which
+        #is handled by the lower and upper diagonals being one element shorter.
+        h = np.diff(x)              #h[i] = x[i+1] - x[i]
+        gradients = np.diff(y)/h
+
+        diagonal = (x[2:] - x[:-2])/3
+        lower = h[1:-1]/6
+        upper = h[1:-1]/6
+        b = np.diff(gradients)
+
+        #Now can solve the matrix equation.  Using the Thomas algorithm rather than
+        #the dense LU decomposition from Q2 makes this O(n) in time and memory.
+        secondDerivatives = np.zeros(n + 1)
+        #Natural spline conditions: the second derivatives at the ends are zero
+        secondDerivatives[1:n] = m.solveTridiagonal(lower, diagonal, upper, b)
+
+        #Expanding equation 4.7 of the lecture notes in powers of t gives the
+        #coefficients of each interval's polynomial.
+        coefficients = np.empty((4, n))
+        coefficients[0] = y[:-1]
+        coefficients[1] = gradients - h*(2*secondDerivatives[:-1] + secondDerivatives[1:])/6
+        coefficients[2] = secondDerivatives[:-1]/2
+        coefficients[3] = np.diff(secondDerivatives)/(6*h)
+
+        self._setCoefficients(x, coefficients)
+
+    def _setCoefficients(self, x, coefficients):
+        self.x = x
+        self.coefficients = coefficients
+
+        #The integral of the spline from x[0] up to the start of each interval,
+        #so that integrate() only has to add on part of one interval.
+        h = np.diff(x)
+        intervalIntegrals = h*(coefficients[0] + h*(coefficients[1]/2 + h*(coefficients[2]/3 + h*coefficients[3]/4)))
+        self._cumulativeIntegrals = np.concatenate(([0], np.cumsum(intervalIntegrals)))
+
+    @classmethod
+    def fromCoefficients(cls, x, coefficients):
+        #Creates a spline directly from its knots and (4, n) coefficient
+        #array, without solving for the second derivatives again.
+        spline = cls.__new__(cls)
+        spline._setCoefficients(np.asarray(x, dtype = np.float64), np.asarray(coefficients, dtype = np.float64))
+        return spline
+
+    @property
+    def y(self):
+        #The data y values, recovered by evaluating at the knots.
+        return self(self.x)
+
+    @property
+    def secondDerivatives(self):
+        #The second derivative is 2 c2 at the start of each interval, and
+        #zero at the final knot for a natural spline.
+        return np.append(2*self.coefficients[2], 0)
+
+    def save(self, path):
+        #Saves the spline as a single .npy array of shape (5, n + 1):  the
+        #knots in the first row and the coefficients below them.
+        n = len(self.x) - 1
+        packed = np.zeros((5, n + 1))
+        packed[0] = self.x
+        packed[1:, :n] = self.coefficients
+        np.save(path, packed)
+
+    @classmethod
+    def load(cls, path, mmap_mode = None):
+        #Loads a spline written by save().  mmap_mode is passed to np.load(),
+        #so very large splines can be memory mapped rather than read in.
+        packed = np.load(path, mmap_mode = mmap_mode)
+        return cls.fromCoefficients(packed[0], packed[1:, :-1])
+
+    def findIntervals(self, xValues):
+        #Returns the index 'before' of the data point that starts the interval
+        #containing each x value, using a binary search over the sorted data.
+        #Values outside the data use the first or last interval.
+        before = np.searchsorted(self.x, xValues, side = "right") - 1
+        return np.clip(before, 0, len(self.x) - 2)
+
+    def _localCoordinates(self, xValues):
+        xValues = np.asarray(xValues, dtype = np.float64)
+        before = self.findIntervals(xValues)
+        return before, xValues - self.x[before]
+
+    def __call__(self, xValues):
+        before, t = self._localCoordinates(xValues)
+        c = self.coefficients
+        #Horner's method
+        return c[0][before] + t*(c[1][before] + t*(c[2][before] + t*c[3][before]))
+
+    def derivative(self, xValues, order = 1):
+        #Evaluates the first, second or third derivative of the spline.
+        before, t = self._localCoordinates(xValues)
+        c = self.coefficients
+        if order == 1:
+            return c[1][before] + t*(2*c[2][before] + t*3*c[3][before])
+        elif order == 2:
+            return 2*c[2][before] + 6*c[3][before]*t
+        elif order == 3:
+            return 6*c[3][before] + 0*t
+        raise Exception("Derivatives of order %s are not available, only 1, 2 or 3" % order)
+
+    def _antiderivative(self, xValues):
+        #The integral of the spline from x[0] to each x value.
+        before, t = self._localCoordinates(xValues)
+        c = self.coefficients
+        return self._cumulativeIntegrals[before] + t*(c[0][before] + t*(c[1][before]/2 + t*(c[2][before]/3 + t*c[3][before]/4)))
+
+    def integrate(self, a, b):
+        #The definite integral of the spline from a to b.  a and b may be arrays.
+        return self._antiderivative(b) - self._antiderivative(a)
+
+
+def cubicSplineInterpolation(data, xValues):
+    #data:      x values in zeroth row, y values in 1st row
+    #xValues:  The values over which you wish to plot the spline.
+
+    #To evaluate the same spline repeatedly, create a CubicSpline once and call it.
+    return CubicSpline(data)(xValues)
+
+    
+
+def interpolateChunks(interpolator, chunks, chunkSize = 1 << 20):
+    #Evaluates an interpolator (e.g. a BarycentricInterpolator or CubicSpline)
+    #on a stream of x values, yielding the y values one chunk at a time so
+    #that memory use is bounded by the chunk size rather than the stream.
+    #chunks:  an iterable of arrays of x values, or a single (possibly memory
+    #mapped) array, which is read chunkSize values at a time.
+    if isinstance(chunks, np.ndarray):
+        flat = chunks.reshape(-1)
+        chunks = (flat[start:start + chunkSize] for start in range(0, len(flat), chunkSize))
+
+    for chunk in chunks:
+        yield interpolator(chunk)
+
+
+def interpolateFile(interpolator, inputPath, outputPath, chunkSize = 1 << 20):
+    #Evaluates an interpolator on the x values stored in the .npy file
+    #inputPath and writes the y values to the .npy file outputPath.  Both
+    #files are memory mapped, so neither has to fit in memory.
+    xValues = np.load(inputPath, mmap_mode = "r")
+    yValues = np.lib.format.open_memmap(outputPath, mode = "w+", dtype = np.float64, shape = np.shape(xValues))
+
+    flat = yValues.reshape(-1)
+    start = 0
+    for chunk in interpolateChunks(interpolator, xValues, chunkSize):
+        flat[start:start + len(chunk)] = chunk
+        start += len(chunk)
+
+    yValues.flush()
+    return yValues
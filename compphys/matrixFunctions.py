@@ -0,0 +1,603 @@
+import numpy as np
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from .profiling import instrumented, measureFactorisation, measureSolve
+from .cache import ByteBudgetCache
+
+#Note that the matrix functions given in this file assume that vectors are
+#defined vertically, i.e some vector v is np.array([[1], [2], [3]]) rather
+#than np.array([1, 2, 3]).  This was done for generality, since one may 
+#actually want to use a 1x3 matrix instead of a 3x1 in some circumstances,
+#even though using 3x1 vectors is far more common.
+
+
+def _factorise(R, blockSize, perm = None):
+    #Factorise the square float array R in place into its packed LU form.
+    #If perm is given then partial pivoting is used, and the row swaps are
+    #recorded in perm so that M[perm] = LU for the original matrix M.
+
+    #This is the same Doolittle method described in section 3.4 of the lecture
+    #notes, reordered as a right-looking blocked algorithm.  The matrix is
+    #processed in panels of blockSize columns:
+    #   1. the panel is factorised with rank-1 updates,
+    #   2. the block row to the right of the panel is turned into rows of U,
+    #   3. the trailing submatrix is updated with one matrix product.
+    #Step 3 does nearly all of the work and runs as a single NumPy kernel.
+    n = np.shape(R)[0]
+    for k0 in range(0, n, blockSize):
+        k1 = min(k0 + blockSize, n)
+
+        #1. Factorise the panel R[k0:, k0:k1]
+        for j in range(k0, k1):
+            if perm is not None:
+                #Bring the largest remaining element of the column onto the
+                #diagonal.  Swapping whole rows keeps the parts of L to the
+                #left and the unprocessed columns to the right consistent.
+                p = j + np.argmax(np.abs(R[j:, j]))
+                if R[p, j] == 0:
+                    raise np.linalg.LinAlgError("Matrix is singular")
+                if p != j:
+                    R[[j, p]] = R[[p, j]]
+                    perm[[j, p]] = perm[[p, j]]
+
+            R[j+1:, j] /= R[j, j]
+            R[j+1:, j+1:k1] -= np.outer(R[j+1:, j], R[j, j+1:k1])
+
+        if k1 < n:
+            #2. Forward substitution with the unit lower triangle of the panel
+            for j in range(k0, k1):
+                R[j+1:k1, k1:] -= np.outer(R[j+1:k1, j], R[j, k1:])
+
+            #3. Update the trailing submatrix
+            R[k1:, k1:] -= R[k1:, k0:k1] @ R[k0:k1, k1:]
+
+    return R
+
+
+def _checkSquare(M):
+    if np.ndim(M) != 2 or np.shape(M)[0] != np.shape(M)[1]:
+        raise ValueError("LU decomposition requires a square matrix, got shape %s" % (np.shape(M),))
+
+
+def _packedCopy(M, overwrite_a):
+    #Returns the float array that the factorisation will be written into.
+    _checkSquare(M)
+
+    if overwrite_a and isinstance(M, np.ndarray) and M.dtype == np.float64:
+        return M
+    return np.array(M, dtype = np.float64)
+
+
+def _forwardSubstitution(L, x, unitDiagonal = False, blockSize = 64):
+    #Overwrites x with the solution of Ly = x, where L is lower triangular.
+    #x may be a single column or an (n, k) block of right-hand sides, in
+    #which case all k columns are updated together.  Only the lower triangle
+    #of L is read, and its diagonal is taken to be 1 if unitDiagonal is True,
+    #so L can be a packed LU matrix.
+    n = np.shape(L)[0]
+    for k0 in range(0, n, blockSize):
+        k1 = min(k0 + blockSize, n)
+        #Solve the small triangular system on the diagonal block row by row...
+        for i in range(k0, k1):
+            if i > k0:
+                x[i] -= L[i, k0:i] @ x[k0:i]
+            if not unitDiagonal:
+                x[i] /= L[i, i]
+        #...then remove its contribution from every row below at once.
+        if k1 < n:
+            x[k1:] -= L[k1:, k0:k1] @ x[k0:k1]
+    return x
+
+
+def _backSubstitution(U, x, unitDiagonal = False, blockSize = 64):
+    #Overwrites x with the solution of Uy = x, where U is upper triangular.
+    #This mirrors _forwardSubstitution(), working up from the last row.
+    n = np.shape(U)[0]
+    for k1 in range(n, 0, -blockSize):
+        k0 = max(k1 - blockSize, 0)
+        for i in range(k1 - 1, k0 - 1, -1):
+            if i < k1 - 1:
+                x[i] -= U[i, i+1:k1] @ x[i+1:k1]
+            if not unitDiagonal:
+                x[i] /= U[i, i]
+        if k0 > 0:
+            x[:k0] -= U[:k0, k0:k1] @ x[k0:k1]
+    return x
+
+
+def _solvePacked(R, perm, b, transpose = False):
+    #Solves Ax = b (or A^T x = b if transpose is True) using the packed LU
+    #form R of A[perm].  b may be a single vector or a block of columns.
+    b = np.asarray(b, dtype = np.float64)
+
+    if not transpose:
+        #A = P^T L U, so solve L U x = b[perm]
+        x = b[perm]
+        _forwardSubstitution(R, x, unitDiagonal = True)
+        return _backSubstitution(R, x)
+
+    #A^T = U^T L^T P, so solve U^T z = b, then L^T w = z, then x = P^T w
+    w = b.copy()
+    _forwardSubstitution(R.T, w)
+    _backSubstitution(R.T, w, unitDiagonal = True)
+    x = np.empty_like(w)
+    x[perm] = w
+    return x
+
+
+def estimateConditionNumber(R, perm, normA):
+    #Estimates the 1-norm condition number ||A||_1 ||A^-1||_1 of a matrix A
+    #from its pivoted packed factorisation, without forming A^-1.
+    #normA is ||A||_1, the largest absolute column sum of A.
+
+    #Hager's method, with Higham's refinements (Higham, "FORTRAN codes for
+    #estimating the one-norm of a real or complex matrix", 1988).  Each
+    #iteration costs two O(n^2) solves rather than the O(n^3) of an inverse.
+    n = np.shape(R)[0]
+    if n == 0:
+        #An empty matrix has nothing to lose accuracy in
+        return 0
+
+    x = np.full(n, 1/n)
+    estimate = 0
+    previousIndex = -1
+    for iteration in range(5):
+        y = _solvePacked(R, perm, x)
+        estimate = np.sum(np.abs(y))
+
+        xi = np.where(y >= 0, 1.0, -1.0)
+        z = _solvePacked(R, perm, xi, transpose = True)
+        j = int(np.argmax(np.abs(z)))
+        if np.abs(z[j]) <= z @ x or j == previousIndex:
+            break
+        x = np.zeros(n)
+        x[j] = 1
+        previousIndex = j
+
+    #Higham's alternative test vector catches matrices that fool the
+    #iteration above.
+    if n > 1:
+        signs = np.where(np.arange(n) % 2 == 0, 1.0, -1.0)
+        x = signs*(1 + np.arange(n)/(n - 1))
+        alternative = 2*np.sum(np.abs(_solvePacked(R, perm, x)))/(3*n)
+        estimate = max(estimate, alternative)
+
+    return normA*estimate
+
+
+@instrumented(measureFactorisation)
+def LU_decomposition(M, overwrite_a = False, blockSize = 64):
+    #M is a square input matrix
+    #overwrite_a:  If True and M is already a float array, the factorisation
+    #is performed in M's own memory instead of a copy.
+    #blockSize:  The width of the column panels used in the blocked algorithm.
+
+    # L and U are built in place in a single packed matrix R.  The strictly
+    # lower triangle holds L (whose unit diagonal is implied by the Doolittle
+    # choice) and the upper triangle including the diagonal holds U.  This
+    # halves the memory used and avoids a copying step at the end.
+    R = _packedCopy(M, overwrite_a)
+    _factorise(R, blockSize)
+
+    #Return R, the single matrix that combines L and U.
+    #L and U can be recovered by separating along the diagonal
+    #and using L[i][i] = 1.
+    return R
+
+
+@instrumented(measureFactorisation)
+def LU_decompositionPivoted(M, overwrite_a = False, blockSize = 64):
+    #As LU_decomposition(), but with partial pivoting, so that it also works
+    #for matrices that are not diagonally dominant.
+    #Returns:
+    #   R:  the packed LU factorisation of M[perm]
+    #   perm:  integer array of row indices, such that M[perm] = LU
+    #   cond:  an estimate of the 1-norm condition number of M.  Solutions of
+    #          Mx = b can lose up to log10(cond) significant figures.
+
+    R = _packedCopy(M, overwrite_a)
+    #The norm must be taken before R is overwritten
+    normA = np.max(np.sum(np.abs(R), axis = 0)) if np.size(R) else 0
+
+    perm = np.arange(np.shape(R)[0])
+    _factorise(R, blockSize, perm)
+    cond = estimateConditionNumber(R, perm, normA)
+
+    return R, perm, cond
+
+
+def getDecomposition(M, pivot = False):
+    # This function performs LU decomposition on M using LU_decomposition(), but
+    # puts the output in the form L U.
+    # If pivot is True then LU_decompositionPivoted() is used instead, and the
+    # permutation perm is returned as well, so that M[perm] = LU.
+
+    if pivot:
+        R, perm, cond = LU_decompositionPivoted(M)
+    else:
+        R = LU_decomposition(M)
+
+    #Now extract L and U from R.  All values can be copied out except the diagonal
+    #elements of L, which are all 1.
+    L = np.tril(R, -1)
+    np.fill_diagonal(L, 1)
+    U = np.triu(R)
+
+    if pivot:
+        return L, U, perm
+    return L, U
+    
+
+@instrumented(measureSolve)
+def solveMatrixEquation(L, U, b, perm = None, out = None):
+    #This function solves the matrix equation Ax = b for x, where
+    #A = LU, or A[perm] = LU if the permutation from a pivoted
+    #decomposition is given.
+    #b may be a single column vector or an (n, k) matrix whose columns are
+    #k separate right-hand sides, which are all solved together.
+    #out:  optional float array with the same shape as b to write x into.
+    #It may be b itself.
+
+    b = np.asarray(b)
+    if perm is not None:
+        b = b[perm]
+
+    if out is None:
+        out = np.array(b, dtype = np.float64)
+    else:
+        if np.shape(out) != np.shape(b):
+            raise ValueError("out has shape %s but b has shape %s" % (np.shape(out), np.shape(b)))
+        out[...] = b
+
+    #The following algorithms are based on the methods for forward
+    #and bakward substitution described in section 3.4 of the lecture
+    #notes, applied to whole rows of the right-hand side at once.
+
+    #First need to solve Ly = b using forward substitution
+    _forwardSubstitution(L, out)
+
+    #Need to solve Ux = y using backward substitution
+    _backSubstitution(U, out)
+
+    return out
+
+
+def invert(L, U, perm = None, out = None):
+    #Finds the inverse of A = LU (or A[perm] = LU) by solving A A^-1 = I
+    #for every column of the identity in a single call.
+
+    n = np.shape(L)[0]
+    return solveMatrixEquation(L, U, np.eye(n), perm, out)
+
+
+class Factorization:
+    '''
+    A pivoted LU factorisation of a square matrix A, kept in the packed form
+    returned by LU_decompositionPivoted() so that it can be reused for any
+    number of solves without repeating the O(n^3) decomposition.
+
+    Use factorize() rather than creating these directly to get the benefit
+    of the module-level cache.
+    '''
+
+    def __init__(self, M, overwrite_a = False):
+        self.R, self.perm, self.cond = LU_decompositionPivoted(M, overwrite_a)
+
+    @property
+    def shape(self):
+        return np.shape(self.R)
+
+    @property
+    def nbytes(self):
+        return self.R.nbytes + self.perm.nbytes
+
+    @property
+    def L(self):
+        L = np.tril(self.R, -1)
+        np.fill_diagonal(L, 1)
+        return L
+
+    @property
+    def U(self):
+        return np.triu(self.R)
+
+    def solve(self, b, out = None):
+        #Solves Ax = b, where b is a column vector or an (n, k) block of
+        #right-hand sides.  out is an optional buffer for x.
+        b = np.asarray(b)
+        if out is None:
+            out = np.array(b[self.perm], dtype = np.float64)
+        else:
+            if np.shape(out) != np.shape(b):
+                raise ValueError("out has shape %s but b has shape %s" % (np.shape(out), np.shape(b)))
+            out[...] = b[self.perm]
+
+        _forwardSubstitution(self.R, out, unitDiagonal = True)
+        return _backSubstitution(self.R, out)
+
+    def det(self):
+        #det(A) = det(P^T) det(L) det(U).  det(L) is 1, det(U) is the product
+        #of its diagonal and det(P^T) is the parity of the permutation, which
+        #is -1 for each cycle of even length.
+        n = np.shape(self.R)[0]
+        visited = np.zeros(n, dtype = bool)
+        sign = 1
+        for i in range(n):
+            if visited[i]:
+                #Already counted as part of an earlier cycle
+                continue
+            length = 0
+            j = i
+            while not visited[j]:
+                visited[j] = True
+                j = self.perm[j]
+                length += 1
+            if length % 2 == 0:
+                sign = -sign
+
+        return sign*np.prod(np.diag(self.R))
+
+    def inverse(self, out = None):
+        n = np.shape(self.R)[0]
+        return self.solve(np.eye(n), out)
+
+
+def bandwidth(M):
+    #Returns (l, u), the number of non-zero diagonals below and above the
+    #main diagonal of M.  A tridiagonal matrix has l = u = 1.
+    rows, cols = np.nonzero(M)
+    if len(rows) == 0:
+        return 0, 0
+    return int(max(np.max(rows - cols), 0)), int(max(np.max(cols - rows), 0))
+
+
+def toBanded(M, l, u):
+    #Converts a square matrix with bandwidth (l, u) into banded storage.
+    #Only the l + u + 1 diagonals are stored, as the rows of an
+    #(l + u + 1, n) array ab with ab[u + i - j][j] = M[i][j].  This is the
+    #same layout used by LAPACK and scipy.linalg.solve_banded().
+    M = np.asarray(M)
+    n = np.shape(M)[0]
+    ab = np.zeros((l + u + 1, n))
+    for offset in range(-l, u + 1):
+        #offset > 0 are diagonals above the main one, which start in column offset
+        if offset >= 0:
+            ab[u - offset, offset:] = np.diagonal(M, offset)
+        else:
+            ab[u - offset, :n + offset] = np.diagonal(M, offset)
+    return ab
+
+
+def solveTridiagonal(lower, diagonal, upper, b):
+    #Solves Ax = b in O(n) operations when A is tridiagonal, using the Thomas
+    #algorithm (Gaussian elimination without pivoting).  This is stable when
+    #A is diagonally dominant, as the cubic spline matrices are.
+    #lower:  the n-1 elements below the diagonal, lower[i] = A[i+1][i]
+    #diagonal:  the n elements on the diagonal
+    #upper:  the n-1 elements above the diagonal, upper[i] = A[i][i+1]
+    #b:  a column vector, or an (n, k) block of right-hand sides
+
+    n = len(diagonal)
+    x = np.array(b, dtype = np.float64)
+    modifiedUpper = np.zeros(n)
+
+    #Forward sweep, eliminating the lower diagonal
+    pivot = diagonal[0]
+    for i in range(n):
+        if i > 0:
+            pivot = diagonal[i] - lower[i-1]*modifiedUpper[i-1]
+        if pivot == 0:
+            raise np.linalg.LinAlgError("Zero pivot in tridiagonal solve")
+        if i < n - 1:
+            modifiedUpper[i] = upper[i]/pivot
+        if i > 0:
+            x[i] -= lower[i-1]*x[i-1]
+        x[i] /= pivot
+
+    #Back substitution
+    for i in range(n - 2, -1, -1):
+        x[i] -= modifiedUpper[i]*x[i+1]
+
+    return x
+
+
+class BandedFactorization:
+    '''
+    An LU factorisation of a banded matrix, stored in the banded layout
+    described in toBanded().  L takes the place of the l diagonals below the
+    main one, so no fill-in occurs and the decomposition costs O(n l u)
+    rather than O(n^3).
+
+    No pivoting is done (pivoting would widen the band), so this is only
+    used automatically for diagonally dominant matrices.
+    '''
+
+    def __init__(self, ab, l, u, overwrite_ab = False):
+        self.l = l
+        self.u = u
+        self.ab = ab if overwrite_ab else np.array(ab, dtype = np.float64)
+
+        ab = self.ab
+        n = np.shape(ab)[1]
+        for k in range(n):
+            pivot = ab[u][k]
+            if pivot == 0:
+                raise np.linalg.LinAlgError("Zero pivot in banded LU decomposition")
+            #Rows below k within the band, and columns to the right within the band
+            li = min(l, n - 1 - k)
+            ui = min(u, n - 1 - k)
+            if li == 0:
+                continue
+            #Multipliers L[k+1:k+1+li][k]
+            ab[u+1:u+1+li, k] /= pivot
+            #Rank-1 update of the band, one column at a time
+            for j in range(1, ui + 1):
+                ab[u+1-j:u+1-j+li, k+j] -= ab[u+1:u+1+li, k]*ab[u-j][k+j]
+
+    @property
+    def shape(self):
+        n = np.shape(self.ab)[1]
+        return (n, n)
+
+    @property
+    def nbytes(self):
+        return self.ab.nbytes
+
+    def solve(self, b, out = None):
+        #Solves Ax = b, where b is a column vector or an (n, k) block of
+        #right-hand sides.  out is an optional buffer for x.
+        ab, l, u = self.ab, self.l, self.u
+        n = np.shape(ab)[1]
+        if out is None:
+            out = np.array(b, dtype = np.float64)
+        else:
+            if np.shape(out) != np.shape(b):
+                raise ValueError("out has shape %s but b has shape %s" % (np.shape(out), np.shape(b)))
+            out[...] = b
+        x = out
+
+        #Forward substitution with the unit lower band
+        for k in range(n - 1):
+            li = min(l, n - 1 - k)
+            if li > 0:
+                x[k+1:k+1+li] -= np.multiply.outer(ab[u+1:u+1+li, k], x[k])
+
+        #Backward substitution with the upper band, column by column
+        for k in range(n - 1, -1, -1):
+            x[k] /= ab[u][k]
+            ui = min(u, k)
+            if ui > 0:
+                x[k-ui:k] -= np.multiply.outer(ab[u-ui:u, k], x[k])
+
+        return x
+
+    def det(self):
+        return np.prod(self.ab[self.u])
+
+    def inverse(self, out = None):
+        n = np.shape(self.ab)[1]
+        return self.solve(np.eye(n), out)
+
+
+def _isDiagonallyDominant(ab, l, u):
+    #Checks for (weak) row diagonal dominance using the banded storage.
+    diagonal = np.abs(ab[u])
+    offDiagonal = np.zeros_like(diagonal)
+    n = len(diagonal)
+    for offset in range(-l, u + 1):
+        if offset > 0:
+            #Row i holds A[i][i+offset] in column i + offset of ab
+            offDiagonal[:n-offset] += np.abs(ab[u - offset, offset:])
+        elif offset < 0:
+            offDiagonal[-offset:] += np.abs(ab[u - offset, :n + offset])
+    return np.all(diagonal >= offDiagonal)
+
+
+def _newFactorization(M):
+    #Chooses how to factorise M.  Narrow banded matrices that are diagonally
+    #dominant use BandedFactorization, which needs no pivoting and costs O(n)
+    #for a fixed bandwidth.  Everything else uses the dense pivoted Factorization.
+    n = np.shape(M)[0]
+    l, u = bandwidth(M)
+    if l + u + 1 <= 16 and 2*(l + u + 1) <= n:
+        ab = toBanded(M, l, u)
+        if _isDiagonallyDominant(ab, l, u):
+            try:
+                return BandedFactorization(ab, l, u, overwrite_ab = True)
+            except np.linalg.LinAlgError:
+                pass
+    return Factorization(M)
+
+
+#Factorisations are cached by the contents of the matrix, so that repeatedly
+#solving against the same system matrix only pays for the decomposition once.
+#The least recently used entries are evicted once the total size of the
+#cached factorisations exceeds the budget (in bytes).
+_factorizationCache = ByteBudgetCache(64*1024*1024)
+
+
+def setFactorizationCacheBudget(nbytes):
+    #Sets the maximum total size of the cached factorisations.  A budget of
+    #0 disables caching.
+    _factorizationCache.setBudget(nbytes)
+
+
+def clearFactorizationCache():
+    _factorizationCache.clear()
+
+
+def factorize(M):
+    #Returns a Factorization of M (or a BandedFactorization, if M has a narrow
+    #band), reusing a cached one if a matrix with the same shape and contents
+    #has been factorised before.  Cached factorisations are shared, so their
+    #arrays are made read-only.
+    M = np.ascontiguousarray(M, dtype = np.float64)
+    #The banded path doesn't go through _packedCopy(), so the shape has to
+    #be checked here
+    _checkSquare(M)
+    key = (np.shape(M), hashlib.blake2b(M.data, digest_size = 16).digest())
+
+    def compute():
+        factorization = _newFactorization(M)
+        for value in vars(factorization).values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write = False)
+        return factorization
+
+    return _factorizationCache.get(key, compute)
+
+
+def matMul(A, B, out = None, workers = None, blockSize = 256):
+    #This function performs matrix multiplication.
+
+    #requires input matrices A and B
+    #These must both be 2D
+    #computes product C = AB
+    #out:  optional float array of shape (A_height, B_width) to write C into.
+    #It must not overlap A or B.
+    #workers:  if greater than 1, row tiles of C are computed concurrently on
+    #a pool of this many threads.  NumPy releases the GIL inside its kernels,
+    #so the tiles genuinely run in parallel.
+    #blockSize:  the height and width of the tiles of C.
+
+    A = np.asarray(A)
+    B = np.asarray(B)
+    if np.ndim(A) != 2 or np.ndim(B) != 2:
+        raise ValueError("matMul requires 2D matrices, got shapes %s and %s" % (np.shape(A), np.shape(B)))
+
+    A_height, A_width = np.shape(A)
+    B_height, B_width = np.shape(B)
+
+    #cannot perform matrix multiplication if
+    #the number columns in A does not match the 
+    #number of rows in B.
+    if A_width != B_height:
+        raise ValueError("Cannot multiply a %dx%d matrix by a %dx%d matrix" % (A_height, A_width, B_height, B_width))
+
+    if out is None:
+        out = np.empty((A_height, B_width), dtype = np.result_type(A, B, np.float64))
+    else:
+        if np.shape(out) != (A_height, B_width):
+            raise ValueError("out has shape %s but the product has shape %s" % (np.shape(out), (A_height, B_width)))
+        if np.shares_memory(out, A) or np.shares_memory(out, B):
+            raise ValueError("out must not overlap the input matrices")
+
+    #C is computed in blockSize x blockSize tiles.  Each tile only needs a
+    #strip of rows of A and a strip of columns of B, which stay in cache
+    #while the tile is computed by a single NumPy kernel.
+    def computeRowTile(i0):
+        i1 = min(i0 + blockSize, A_height)
+        for j0 in range(0, B_width, blockSize):
+            j1 = min(j0 + blockSize, B_width)
+            np.matmul(A[i0:i1], B[:, j0:j1], out = out[i0:i1, j0:j1])
+
+    rowTiles = range(0, A_height, blockSize)
+    if workers is not None and workers > 1 and len(rowTiles) > 1:
+        with ThreadPoolExecutor(max_workers = workers) as pool:
+            #list() makes sure any exception raised in a worker is re-raised here
+            list(pool.map(computeRowTile, rowTiles))
+    else:
+        for i0 in rowTiles:
+            computeRowTile(i0)
+
+    return out
@@ -0,0 +1,175 @@
+import numpy as np
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+#Figures are described by FigureSpec objects, which only hold the data and
+#labels, and are drawn by a FigureRenderer.  Saving a figure (particularly as
+#an .eps at a high dpi) takes much longer than drawing it, so the renderer
+#saves them in a pool of worker processes using matplotlib's non-interactive
+#Agg backend, while the script carries on computing.  matplotlib is only
+#imported by whichever process draws the figure.
+
+#Formats that are saved as images rather than as vector graphics.  Their
+#resolution is set by the dpi.
+RASTER_FORMATS = ("png", "jpg", "jpeg", "tif", "tiff", "webp")
+VECTOR_FORMATS = ("eps", "pdf", "svg", "ps")
+
+
+class FigureSpec:
+    '''
+    The contents of one figure: some lines plus the title, axis labels and
+    whether there is a legend.  Lines are added in the same way as with
+    plt.plot(), e.g.
+
+        spec = FigureSpec("cResiduals", title = "Relative residuals", xlabel = "t/CR")
+        spec.plot(tValues, residuals, label = "Runge-Kutta", color = "red")
+
+    name is the file name the figure is saved under, without an extension,
+    since that depends on the format chosen by the renderer.
+    '''
+
+    def __init__(self, name, title = None, xlabel = None, ylabel = None, legend = False):
+        self.name = name
+        self.title = title
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.legend = legend
+        self.lines = []
+
+    def plot(self, x, y, **style):
+        self.lines.append((np.asarray(x), np.asarray(y), style))
+        return self
+
+
+def _draw(spec, figure):
+    #Draws spec onto figure, which is returned.
+    axes = figure.add_subplot()
+    for x, y, style in spec.lines:
+        axes.plot(x, y, **style)
+    if spec.title is not None:
+        axes.set_title(spec.title)
+    if spec.xlabel is not None:
+        axes.set_xlabel(spec.xlabel)
+    if spec.ylabel is not None:
+        axes.set_ylabel(spec.ylabel)
+    if spec.legend:
+        axes.legend()
+    return figure
+
+
+def renderFigure(spec, directory, format, dpi):
+    #Saves spec to directory/name.format, and returns the path.  This is what
+    #runs in the worker processes (or in this process, with workers = 0).
+    #The figure is drawn on an Agg canvas directly rather than through
+    #pyplot, so the calling process's backend is left alone and the plot
+    #windows of show() still work afterwards.
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    path = os.path.join(directory, "%s.%s" % (spec.name, format))
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    _draw(spec, figure)
+    figure.savefig(path, format = format, dpi = dpi)
+    return path
+
+
+class FigureRenderer:
+    '''
+    Saves figures in the background as they are submitted.
+
+    directory:  where the figures are saved
+    format:  the file format, which is any that matplotlib supports.  The
+     vector formats (eps, pdf, svg) scale to any size, while the raster
+     formats (png, etc) are usually smaller and much quicker to save for
+     figures with many points.
+    dpi:  resolution.  Defaults to 1000 for vector formats, as the scripts
+     always used, and 200 for raster ones.
+    workers:  the number of processes to save figures in.  None uses one per
+     core, and 0 saves each figure straight away in this process.
+    headless:  if True, show() does nothing, so scripts never block waiting
+     for the plot windows to be closed (e.g. in batch or CI runs).
+
+    Use as a context manager, so that the script waits for every figure to
+    be saved at the end:
+
+        with FigureRenderer() as renderer:
+            renderer.submit(spec)
+            ...
+            renderer.show()
+    '''
+
+    def __init__(self, directory = "figures", format = "eps", dpi = None, workers = None, headless = False):
+        if dpi is None:
+            dpi = 200 if format in RASTER_FORMATS else 1000
+        self.directory = directory
+        self.format = format
+        self.dpi = dpi
+        self.workers = workers
+        self.headless = headless
+        self.specs = []
+        self._futures = []
+        self._pool = None
+
+    def submit(self, spec):
+        #Starts saving the figure, and returns straight away.
+        self.specs.append(spec)
+        if self.workers == 0:
+            renderFigure(spec, self.directory, self.format, self.dpi)
+            return
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        self._futures.append(self._pool.submit(renderFigure, spec, self.directory, self.format, self.dpi))
+
+    def wait(self):
+        #Waits until every submitted figure has been saved, and returns their
+        #paths.  Any error raised while saving a figure is raised here.
+        paths = [future.result() for future in self._futures]
+        self._futures = []
+        return paths
+
+    def close(self):
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def show(self):
+        #Displays every submitted figure in windows, as plt.show() did,
+        #unless the renderer is headless.
+        if self.headless:
+            return
+        from matplotlib import pyplot as plt
+        for spec in self.specs:
+            _draw(spec, plt.figure())
+        plt.show()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def scriptRenderer(description = None, argv = None):
+    #Makes the FigureRenderer for one of the Q#_ scripts from its command line
+    #options, which are
+    #   --format FORMAT:  file format of the figures (default eps)
+    #   --dpi DPI
+    #   --workers N:  processes to save figures in (0 saves them in turn)
+    #   --headless:  don't show the figures.  Setting the environment variable
+    #    COMPPHYS_HEADLESS does the same.
+    parser = argparse.ArgumentParser(description = description)
+    parser.add_argument("--format", default = "eps", choices = VECTOR_FORMATS + RASTER_FORMATS)
+    parser.add_argument("--dpi", type = float, default = None)
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--headless", action = "store_true")
+    options = parser.parse_args(argv)
+
+    headless = options.headless or bool(os.environ.get("COMPPHYS_HEADLESS"))
+    return FigureRenderer(format = options.format, dpi = options.dpi, workers = options.workers, headless = headless)
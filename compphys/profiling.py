@@ -0,0 +1,288 @@
+import numpy as np
+import atexit
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+#Opt-in instrumentation of the numerical kernels.  Functions decorated with
+#instrumented() record their wall time, an operation count and measures of
+#their rounding error (residual norms, growth factors) into the active
+#ProfileCollector.  When no collector is active, which is the default, the
+#decorated function is called straight away and nothing else is done.
+#
+#Profiling can be switched on from the environment, without touching any
+#code, by setting COMPPHYS_PROFILE to the path of a JSON file.  The profile
+#of the whole run is then written there when the interpreter exits.
+
+_collector = None
+
+#Exact solutions of differential equations, used to measure the error of
+#solveDifferentialEquation().  Keyed on the right hand side function.
+_exactSolutions = {}
+
+
+class ProfileCollector:
+    '''
+    An in-memory store of the records made by instrumented kernels.
+
+    Each record is a dictionary holding the name of the kernel, the wall time
+    of the call in seconds, the problem size, an estimate of the number of
+    floating point operations (or function evaluations) and whatever
+    accuracy measures apply to that kernel.
+
+    If residuals is False only the cheap quantities are recorded.  Finding
+    the residuals of a factorisation costs about as much as the
+    factorisation itself, so this is the mode to use when only throughput
+    is of interest.
+    '''
+
+    def __init__(self, residuals = True):
+        self.residuals = residuals
+        self.records = []
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            self.records.append(record)
+
+    def clear(self):
+        with self._lock:
+            self.records = []
+
+    def summary(self):
+        #Totals for each kernel: the number of calls, their total and mean
+        #time, and the worst value of each accuracy measure.
+        worstOf = ("factorisationResidual", "growthFactor", "backwardError", "maxRelativeError", "conditionNumber")
+        summary = {}
+        with self._lock:
+            records = list(self.records)
+
+        for record in records:
+            entry = summary.setdefault(record["kernel"], {"calls": 0, "seconds": 0.0})
+            entry["calls"] += 1
+            entry["seconds"] += record["seconds"]
+            for key in worstOf:
+                if record.get(key) is not None:
+                    entry[key] = max(entry.get(key, 0.0), record[key])
+
+        for entry in summary.values():
+            entry["meanSeconds"] = entry["seconds"]/entry["calls"]
+        return summary
+
+    def toJSON(self, path = None):
+        #Returns the records and the summary as a JSON string, and also
+        #writes it to path if one is given.
+        with self._lock:
+            records = list(self.records)
+        text = json.dumps({"records": records, "summary": self.summary()}, indent = 1)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+
+def enableProfiling(residuals = True):
+    #Starts recording into a new collector, which is returned.
+    global _collector
+    _collector = ProfileCollector(residuals)
+    return _collector
+
+
+def disableProfiling():
+    #Stops recording.  Returns the collector that was in use (or None) so that
+    #its records can still be exported.
+    global _collector
+    collector = _collector
+    _collector = None
+    return collector
+
+
+def activeCollector():
+    return _collector
+
+
+class profiling:
+    '''
+    Context manager that records everything inside a with block:
+
+        with profiling() as profile:
+            solveDifferentialEquation(...)
+        profile.toJSON("profile.json")
+
+    Whatever collector was active before the block is restored afterwards.
+    '''
+
+    def __init__(self, residuals = True):
+        self.collector = ProfileCollector(residuals)
+
+    def __enter__(self):
+        global _collector
+        self._previous = _collector
+        _collector = self.collector
+        return self.collector
+
+    def __exit__(self, *exc):
+        global _collector
+        _collector = self._previous
+        return False
+
+
+def registerExactSolution(f, exact):
+    #exact(tValues) gives the true solution of dx/dt = f at each time.  Once
+    #registered, profiled solves of f also record their largest relative
+    #error.
+    _exactSolutions[f] = exact
+
+
+def instrumented(measure):
+    #Decorator for the kernels.  measure(collector, function, arguments) calls
+    #function with the bound arguments and returns its result, recording what
+    #it measured in the collector.
+    def decorate(function):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            collector = _collector
+            if collector is None:
+                return function(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return measure(collector, function, bound)
+        return wrapper
+    return decorate
+
+
+def _timedCall(function, bound):
+    start = time.perf_counter()
+    result = function(*bound.args, **bound.kwargs)
+    return result, time.perf_counter() - start
+
+
+def _norm1(A):
+    #The 1-norm, of a vector or (the largest column sum) of a matrix
+    return float(np.max(np.sum(np.abs(A), axis = 0))) if np.size(A) else 0.0
+
+
+def _unpack(R):
+    L = np.tril(R, -1)
+    np.fill_diagonal(L, 1)
+    return L, np.triu(R)
+
+
+def measureFactorisation(collector, function, bound):
+    #For LU_decomposition() and LU_decompositionPivoted().  Records the
+    #relative residual ||LU - A|| / ||A|| and the growth factor
+    #max|U| / max|A|, which bounds how much rounding error the elimination
+    #can have introduced.
+    M = np.asarray(bound.arguments["M"])
+    #M may be factorised in place, so it has to be kept first
+    A = np.array(M, dtype = np.float64) if collector.residuals else None
+
+    result, seconds = _timedCall(function, bound)
+    pivoted = isinstance(result, tuple)
+    R = result[0] if pivoted else result
+    n = np.shape(R)[0]
+
+    record = {"kernel": function.__name__, "seconds": seconds, "n": n, "flops": 2*n**3/3}
+    if pivoted:
+        record["conditionNumber"] = float(result[2])
+
+    if A is not None and n > 0:
+        if pivoted:
+            A = A[result[1]]
+        L, U = _unpack(R)
+        normA = _norm1(A)
+        record["factorisationResidual"] = _norm1(L @ U - A)/normA if normA else 0.0
+        largestA = np.max(np.abs(A))
+        record["growthFactor"] = float(np.max(np.abs(U))/largestA) if largestA else 1.0
+
+    collector.add(record)
+    return result
+
+
+def measureSolve(collector, function, bound):
+    #For solveMatrixEquation().  Records the residual ||b - LUx|| and the
+    #normwise backward error ||b - LUx|| / (||L|| ||U|| ||x|| + ||b||), which
+    #is of the order of the machine epsilon for a stable solve.
+    arguments = bound.arguments
+    L, U = arguments["L"], arguments["U"]
+    #out may be b itself, so b has to be kept first
+    b = np.array(arguments["b"], dtype = np.float64) if collector.residuals else None
+
+    x, seconds = _timedCall(function, bound)
+    n = np.shape(L)[0]
+    columns = 1 if np.ndim(x) == 1 else np.shape(x)[1]
+
+    record = {"kernel": function.__name__, "seconds": seconds, "n": n, "rightHandSides": columns, "flops": 2*n**2*columns}
+
+    if b is not None and n > 0:
+        if arguments["perm"] is not None:
+            b = b[arguments["perm"]]
+        residual = _norm1(b - L @ (U @ x))
+        scale = _norm1(L)*_norm1(U)*_norm1(x) + _norm1(b)
+        record["residualNorm"] = residual
+        record["backwardError"] = residual/scale if scale else 0.0
+
+    collector.add(record)
+    return x
+
+
+def measureDifferentialEquation(collector, function, bound):
+    #For solveDifferentialEquation().  Records the number of steps and of
+    #evaluations of the right hand side, and the largest relative error if
+    #an exact solution has been registered for it.  The fixed step methods
+    #take one step per interval of tValues, while the adaptive method
+    #reports the steps it actually took, including the rejected ones.
+    arguments = bound.arguments
+    adaptive = arguments["method"] == 3
+    if adaptive and arguments["statistics"] is None:
+        arguments["statistics"] = {}
+    f = arguments["f"]
+    exact = _exactSolutions.get(f)
+
+    #Plain Python functions are wrapped to count their evaluations.  Anything
+    #else (e.g. a compiled RHS) is passed through untouched, so that the
+    #solver still takes the same path.
+    evaluations = None
+    if inspect.isfunction(f):
+        evaluations = [0]
+        def counted(*args):
+            evaluations[0] += 1
+            return f(*args)
+        arguments["f"] = counted
+
+    xValues, seconds = _timedCall(function, bound)
+    tValues = arguments["tValues"]
+
+    record = {
+        "kernel": function.__name__,
+        "seconds": seconds,
+        "method": arguments["method"],
+        "steps": arguments["statistics"]["acceptedSteps"] if adaptive else len(tValues) - 1,
+        "stateSize": int(np.size(arguments["x0"])),
+        "rhsEvaluations": None if evaluations is None else evaluations[0],
+    }
+
+    if adaptive:
+        record["rejectedSteps"] = arguments["statistics"]["rejectedSteps"]
+
+    if exact is not None and collector.residuals:
+        with np.errstate(divide = "ignore", invalid = "ignore"):
+            trueValues = np.asarray(exact(np.asarray(tValues)), dtype = np.float64).reshape(np.shape(xValues))
+            relativeErrors = np.abs(xValues - trueValues)/np.abs(trueValues)
+        record["maxRelativeError"] = float(np.max(relativeErrors[np.isfinite(relativeErrors)], initial = 0.0))
+
+    collector.add(record)
+    return xValues
+
+
+#Switch profiling on for the whole run if requested in the environment
+_profilePath = os.environ.get("COMPPHYS_PROFILE")
+if _profilePath:
+    enableProfiling()
+    atexit.register(lambda: _collector is not None and _collector.toJSON(_profilePath))
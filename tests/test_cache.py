@@ -0,0 +1,23 @@
+import numpy as np
+from compphys.cache import ByteBudgetCache
+from compphys import matrixFunctions as m
+
+
+def test_leastRecentlyUsedIsEvicted():
+    cache = ByteBudgetCache(budget = 2*8*10)
+    a = cache.get("a", lambda: np.zeros(10))
+    cache.get("b", lambda: np.zeros(10))
+    assert cache.get("a", lambda: np.ones(10)) is a
+    cache.get("c", lambda: np.zeros(10))
+    assert len(cache) == 2 and cache.nbytes == 160
+    #b was the least recently used, so it has been evicted and is recomputed
+    assert cache.get("b", lambda: np.ones(10))[0] == 1
+
+
+def test_factorizeIsCached():
+    m.clearFactorizationCache()
+    A = np.array([[4.0, 1.0], [2.0, 3.0]])
+    assert m.factorize(A) is m.factorize(A.copy())
+    m.setFactorizationCacheBudget(0)
+    assert m.factorize(A) is not m.factorize(A)
+    m.setFactorizationCacheBudget(64*1024*1024)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from compphys.differentialEquations import solveDifferentialEquation
+
+
+def test_dormandPrinceFailsOnNaN():
+    #Used to reject every step forever, shrinking the step size to 0
+    f = lambda t, x: np.nan if t > 1 else -x
+    with pytest.raises(Exception, match = "not finite"):
+        solveDifferentialEquation(f, 1.0, np.linspace(0, 2, 5), 3)
+
+
+def test_dormandPrinceFailsOnSingularity():
+    #dx/dt = x^2 with x(0) = 1 blows up at t = 1
+    f = lambda t, x: x**2
+    with pytest.raises(Exception, match = "too small|not finite"):
+        solveDifferentialEquation(f, 1.0, np.linspace(0, 2, 5), 3)
+
+
+def test_dormandPrinceAccuracy():
+    tValues = np.linspace(0, 5, 11)
+    xValues = solveDifferentialEquation(lambda t, x: -x, 1.0, tValues, 3, rtol = 1e-8, atol = 1e-12)
+    assert np.allclose(xValues, np.exp(-tValues), rtol = 1e-6)
+
+
+def test_ensembleOfScalarRHS():
+    #An RHS that isn't vectorized is called for each member of the ensemble,
+    #and gives the same result as the vectorized version
+    from compphys.differentialEquations import RHS, RHS_func_2, RHS_func_2_vectorized, solveEnsemble
+    tValues = np.linspace(0, 3, 301)
+    periods = np.array([0.5, 2])
+    scalar = solveEnsemble(RHS(RHS_func_2), 1, tValues, 1, periods)
+    vectorized = solveEnsemble(RHS(RHS_func_2_vectorized, vectorized = True), 1, tValues, 1, periods)
+    assert np.allclose(scalar, vectorized, rtol = 0, atol = 1e-14)
+    for column, period in enumerate(periods):
+        assert np.array_equal(scalar[:, column], solveDifferentialEquation(RHS_func_2, 1.0, tValues, 1, period))
@@ -0,0 +1,28 @@
+import numpy as np
+from compphys.floatingPoint import findNearestNumbers
+
+
+def test_neighboursMatchNextafter():
+    for dtype in (np.float16, np.float32, np.float64):
+        info = np.finfo(dtype)
+        #finfo.smallest_subnormal needs numpy 1.22, and requirements.txt pins 1.19
+        smallestSubnormal = np.nextafter(dtype(0), dtype(1))
+        x = np.array([0.25, -3.7, info.tiny, smallestSubnormal, -smallestSubnormal, info.max], dtype = dtype)
+        lower, upper, lowerRange, upperRange = findNearestNumbers(x)
+        with np.errstate(over = "ignore"):
+            assert np.array_equal(upper, np.nextafter(x, dtype(np.inf)))
+            assert np.array_equal(lower, np.nextafter(x, dtype(-np.inf)))
+
+
+def test_subnormalFractionalRanges():
+    x = np.array([1e-310, 2.2250738585072014e-308, 5e-324])
+    lower, upper, lowerRange, upperRange = findNearestNumbers(x)
+    assert np.all(lowerRange < 0) and np.all(upperRange > 0)
+    assert lowerRange[2] == -0.5 and upperRange[2] == 0.5
+    assert np.allclose(upperRange, 0.5*(5e-324/x))
+
+
+def test_zero():
+    lower, upper, lowerRange, upperRange = findNearestNumbers(0.0)
+    assert lower == -5e-324 and upper == 5e-324
+    assert np.isnan(lowerRange) and np.isnan(upperRange)
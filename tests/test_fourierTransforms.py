@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+from compphys.fourierTransforms import kernelHalfWidth, OverlapAddConvolver, responseFunc
+
+
+def test_kernelHalfWidthOfGaussian():
+    K = kernelHalfWidth(responseFunc, 0.1)
+    assert abs(responseFunc(K*0.1)) <= 1e-12*responseFunc(0)
+
+
+def test_responseThatNeverFallsOff():
+    #Used to double the half width forever
+    with pytest.raises(ValueError):
+        OverlapAddConvolver(lambda t: np.ones(np.shape(t)), 0.1)
+    with pytest.raises(ValueError):
+        kernelHalfWidth(lambda t: 1/(1 + np.abs(t)), 0.1, maxHalfWidth = 1024)
@@ -0,0 +1,21 @@
+import numpy as np
+from compphys.interpolation import BarycentricInterpolator
+
+
+def test_barycentricManyChebyshevPoints():
+    #With unscaled weights, the products of differences underflow beyond
+    #about 1100 Chebyshev points and the interpolant is NaN
+    for n in (1200, 3000):
+        x = np.cos(np.pi*(2*np.arange(n) + 1)/(2*n))
+        interpolator = BarycentricInterpolator(np.array([x, np.sin(3*x)]))
+        xValues = np.linspace(-0.99, 0.99, 101)
+        assert np.allclose(interpolator(xValues), np.sin(3*xValues), atol = 1e-10)
+
+
+def test_addKnotMatchesConstructor():
+    x = np.cos(np.pi*(2*np.arange(1500) + 1)/3000)
+    y = np.exp(x)
+    interpolator = BarycentricInterpolator(np.array([x[:-1], y[:-1]]))
+    interpolator.addKnot(x[-1], y[-1])
+    xValues = np.linspace(-0.9, 0.9, 51)
+    assert np.allclose(interpolator(xValues), np.exp(xValues), atol = 1e-10)
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from compphys import matrixFunctions as m
+
+
+def test_detMatchesNumpyWhenPivoting():
+    #[[1, 2], [3, 4]] needs its rows swapping, so the sign of the permutation
+    #matters
+    A = np.array([[1.0, 2.0], [3.0, 4.0]])
+    assert np.isclose(m.Factorization(A).det(), np.linalg.det(A))
+
+    rng = np.random.default_rng(0)
+    for n in (63, 64, 300):
+        A = rng.standard_normal((n, n))
+        factorization = m.Factorization(A)
+        assert not np.array_equal(factorization.perm, np.arange(n))
+        assert np.isclose(factorization.det(), np.linalg.det(A), rtol = 1e-8)
+
+
+def test_pivotedDecompositionOfEmptyMatrix():
+    R, perm, cond = m.LU_decompositionPivoted(np.zeros((0, 0)))
+    assert np.shape(R) == (0, 0) and len(perm) == 0 and cond == 0
+
+
+def test_conditionNumberEstimate():
+    rng = np.random.default_rng(1)
+    A = rng.standard_normal((40, 40))
+    R, perm, cond = m.LU_decompositionPivoted(A)
+    exact = np.linalg.cond(A, 1)
+    #Hager's estimate is a lower bound, and is usually within a factor of 3
+    assert exact/3 <= cond <= exact*(1 + 1e-10)
+
+
+def test_factorizeRejectsNonSquare():
+    #Both of these are narrow banded, so they used to skip the dense path's
+    #shape check
+    for shape in ((10, 12), (12, 10)):
+        with pytest.raises(ValueError, match = "square"):
+            m.factorize(np.eye(*shape)*5)
@@ -0,0 +1,31 @@
+import os
+import matplotlib
+import numpy as np
+from compphys.plotting import FigureSpec, FigureRenderer
+
+
+def test_renderingInProcessLeavesBackendAlone(tmp_path):
+    #Saving with workers = 0 used to switch this process to Agg, so that
+    #show() could never open a window
+    #Any non-Agg backend will do, as long as it doesn't need a display
+    previous = matplotlib.get_backend()
+    matplotlib.use("svg")
+    backend = matplotlib.get_backend()
+    spec = FigureSpec("line", title = "A line", xlabel = "x", ylabel = "y", legend = True)
+    spec.plot(np.arange(3), np.arange(3), label = "y = x")
+    with FigureRenderer(directory = str(tmp_path), format = "png", workers = 0, headless = True) as renderer:
+        renderer.submit(spec)
+    try:
+        assert matplotlib.get_backend() == backend
+    finally:
+        matplotlib.use(previous)
+    assert os.path.getsize(os.path.join(str(tmp_path), "line.png")) > 0
+
+
+def test_renderingInWorkers(tmp_path):
+    spec = FigureSpec("line").plot([0, 1], [1, 0])
+    with FigureRenderer(directory = str(tmp_path), format = "eps", workers = 1, headless = True) as renderer:
+        renderer.submit(spec)
+        paths = renderer.wait()
+    assert paths == [os.path.join(str(tmp_path), "line.eps")]
+    assert os.path.getsize(paths[0]) > 0
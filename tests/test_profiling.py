@@ -0,0 +1,35 @@
+import numpy as np
+from compphys import matrixFunctions as m
+from compphys.differentialEquations import solveDifferentialEquation
+from compphys.profiling import profiling
+
+
+def test_adaptiveSolveRecordsStepsTaken():
+    tValues = np.linspace(0, 10, 3)
+    statistics = {}
+    with profiling() as profile:
+        solveDifferentialEquation(lambda t, x: -x, 1.0, tValues, 3, statistics = statistics)
+        solveDifferentialEquation(lambda t, x: -x, 1.0, tValues, 1)
+    adaptive, fixed = profile.records
+    #Dormand-Prince needs many more steps than there are output intervals
+    assert adaptive["steps"] == statistics["acceptedSteps"] > len(tValues) - 1
+    assert adaptive["rejectedSteps"] == statistics["rejectedSteps"]
+    assert adaptive["rhsEvaluations"] >= 6*adaptive["steps"]
+    assert fixed["steps"] == len(tValues) - 1 and fixed["rhsEvaluations"] == 4*fixed["steps"]
+
+
+def test_factorisationResiduals():
+    A = np.random.default_rng(2).random((30, 30)) + 30*np.eye(30)
+    with profiling() as profile:
+        L, U = m.getDecomposition(A)
+        m.solveMatrixEquation(L, U, np.ones(30))
+    factorisation, solve = profile.records
+    assert factorisation["factorisationResidual"] < 1e-14
+    assert solve["backwardError"] < 1e-14
+
+
+def test_disabledRecordsNothing():
+    with profiling() as profile:
+        pass
+    m.getDecomposition(np.eye(3))
+    assert profile.records == []